@@ -0,0 +1,116 @@
+"""
+Генератор синтетических данных для схемы employees/tasks.
+
+    python -m benchmarks.generator --employees 1000 --tasks 100000 --chain-depth 1000 --seed 42
+
+Идентификаторы назначаются заранее, поэтому и цепочки base_task,
+и остальные задачи вставляются пакетами, без запросов на каждую строку.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from core.models.employee import Employee
+from core.models.task import Task
+from src.database import async_session_maker, engine
+from src.employees.services import repair_active_tasks_counts
+
+POSITIONS = ('developer', 'analyst', 'tester', 'designer', 'manager', 'devops')
+FIRST_NAMES = ('Alex', 'Maria', 'Ivan', 'Olga', 'Pavel', 'Anna', 'Sergey', 'Elena', 'Dmitry', 'Irina')
+SECOND_NAMES = ('Smirnov', 'Ivanova', 'Kuznetsov', 'Popova', 'Sokolov', 'Lebedeva', 'Kozlov', 'Novikova')
+
+
+def _chunks(rows: list[dict], size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def build_employees(count: int, first_id: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            'id': first_id + number,
+            'first_name': rng.choice(FIRST_NAMES),
+            'second_name': rng.choice(SECOND_NAMES),
+            'position': rng.choice(POSITIONS),
+        }
+        for number in range(count)
+    ]
+
+
+def build_tasks(count: int, first_id: int, employee_ids: list[int], chain_depth: int,
+                rng: random.Random, subtask_ratio: float = 0.3, unassigned_ratio: float = 0.2) -> list[dict]:
+    """Первые chain_depth задач образуют одну цепочку base_task, остальные - случайный лес"""
+    today = date.today()
+    rows = []
+    for number in range(count):
+        task_id = first_id + number
+        if 0 < number < chain_depth:
+            base_task = task_id - 1
+        elif number >= chain_depth and rng.random() < subtask_ratio:
+            base_task = rng.randrange(first_id, task_id)
+        else:
+            base_task = None
+        rows.append({
+            'id': task_id,
+            'title': f'Task {task_id}',
+            'deadline': today + timedelta(days=rng.randint(-60, 120)),
+            'is_active': rng.random() < 0.7,
+            'base_task': base_task,
+            'employee_id': None if rng.random() < unassigned_ratio or not employee_ids else rng.choice(employee_ids),
+        })
+    return rows
+
+
+async def generate(employees: int, tasks: int, chain_depth: int, seed: int, batch_size: int = 5000) -> dict:
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    async with engine.begin() as connection:
+        first_employee_id = (await connection.scalar(select(func.coalesce(func.max(Employee.id), 0)))) + 1
+        first_task_id = (await connection.scalar(select(func.coalesce(func.max(Task.id), 0)))) + 1
+
+        employee_rows = build_employees(employees, first_employee_id, rng)
+        for chunk in _chunks(employee_rows, batch_size):
+            await connection.execute(insert(Employee.__table__), chunk)
+
+        task_rows = build_tasks(tasks, first_task_id, [row['id'] for row in employee_rows], chain_depth, rng)
+        for chunk in _chunks(task_rows, batch_size):
+            await connection.execute(insert(Task.__table__), chunk)
+
+        for table in ('employees', 'tasks'):
+            await connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+            ))
+
+    async with async_session_maker() as session:
+        await repair_active_tasks_counts(session)
+
+    return {
+        'employees': employees,
+        'tasks': tasks,
+        'chain_depth': chain_depth,
+        'seed': seed,
+        'first_employee_id': first_employee_id,
+        'first_task_id': first_task_id,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Fill employees/tasks with synthetic data')
+    parser.add_argument('--employees', type=int, default=1000)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--chain-depth', type=int, default=1000, help='length of the deepest base_task chain')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+    summary = asyncio.run(generate(args.employees, args.tasks, args.chain_depth, args.seed, args.batch_size))
+    print(summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Микро-бенчмарк обновления и удаления задачи: прежняя схема select-then-mutate
+против одного UPDATE/DELETE ... RETURNING. Работает с базой из .env.
+
+    python -m benchmarks.mutations --iterations 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date
+
+from sqlalchemy import select
+
+from core.models.task import Task
+from src.database import async_session_maker
+from src.tasks import services
+from src.tasks.schemas import TaskCreate, TaskUpdate
+
+
+async def legacy_update_task(task_id: int, task_update: TaskUpdate, session) -> Task:
+    result = await session.execute(select(Task).where(Task.id == task_id))
+    task = result.scalar_one_or_none()
+    for key, value in task_update.model_dump(exclude_none=True).items():
+        setattr(task, key, value)
+    await session.commit()
+    return task
+
+
+async def legacy_delete_task(task_id: int, session) -> dict:
+    result = await session.execute(select(Task).where(Task.id == task_id))
+    task = result.scalar_one_or_none()
+    await session.delete(task)
+    await session.commit()
+    return {'result': 'success'}
+
+
+async def _create_tasks(count: int) -> list[int]:
+    ids = []
+    async with async_session_maker() as session:
+        for number in range(count):
+            new_task = TaskCreate(title=f'benchmark {number}', deadline=date.today(), is_active=False)
+            ids.append((await services.create_task(new_task, session)).id)
+    return ids
+
+
+async def _measure(operation, task_ids: list[int], make_args) -> list[float]:
+    timings = []
+    for task_id in task_ids:
+        async with async_session_maker() as session:
+            started = time.perf_counter()
+            await operation(task_id, *make_args(task_id), session)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f'{name:<28} mean={statistics.mean(timings):7.3f}ms '
+          f'p50={statistics.median(timings):7.3f}ms p95={p95:7.3f}ms')
+
+
+async def run(iterations: int) -> None:
+    task_ids = await _create_tasks(iterations)
+    update_args = lambda task_id: (TaskUpdate(title=f'updated {task_id}'),)
+
+    _report('update: select + mutate', await _measure(legacy_update_task, task_ids, update_args))
+    _report('update: UPDATE RETURNING', await _measure(services.update_task, task_ids, update_args))
+
+    half = len(task_ids) // 2
+    _report('delete: select + delete', await _measure(legacy_delete_task, task_ids[:half], lambda _: ()))
+    _report('delete: DELETE RETURNING', await _measure(services.delete_task, task_ids[half:], lambda _: ()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Update/delete latency micro-benchmark')
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from src.database import engine, read_engine
+
+
+class QueryCounter:
+    """Считает SQL-запросы, выполненные движками приложения"""
+
+    def __init__(self):
+        self.count = 0
+        self.statements: list[str] = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    engines = {engine.sync_engine, read_engine.sync_engine}
+    for sync_engine in engines:
+        event.listen(sync_engine, 'before_cursor_execute', counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        for sync_engine in engines:
+            event.remove(sync_engine, 'before_cursor_execute', counter._before_cursor_execute)
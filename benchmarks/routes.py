@@ -0,0 +1,267 @@
+"""
+Бенчмарк всех маршрутов приложения через httpx.AsyncClient поверх ASGI,
+без сетевого сервера. Для каждого маршрута замеряются задержки (последовательно),
+пропускная способность (параллельные запросы) и число SQL-запросов на вызов.
+Превышение бюджета запросов (признак N+1) завершает прогон с ошибкой.
+Потоковые /changes/stream и /changes/ws не замеряются: ответ не заканчивается.
+
+    python -m benchmarks.generator --tasks 100000
+    python -m benchmarks.routes --iterations 50 --concurrency 20 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import func, select
+
+import src.cache
+from core.models.employee import Employee
+from core.models.task import Task
+from src.database import async_session_maker
+from src.main import app
+from benchmarks.queries import count_queries
+
+Setup = Callable[[httpx.AsyncClient, dict], Awaitable[dict]]
+
+
+@dataclass
+class RouteCase:
+    name: str
+    method: str
+    path: str
+    max_queries: int
+    # тело запроса или функция, строящая его из контекста
+    json: object = None
+    setup: Setup | None = None
+    # запросы, меняющие данные, не гоняем параллельно по одним и тем же id
+    concurrent: bool = True
+
+    async def prepare(self, client: httpx.AsyncClient, context: dict) -> tuple[str, object]:
+        """Путь и тело запроса; setup создает нужные строки вне замера"""
+        call_context = dict(context)
+        if self.setup is not None:
+            call_context.update(await self.setup(client, context))
+        body = self.json(call_context) if callable(self.json) else self.json
+        return self.path.format(**call_context), body
+
+
+@dataclass
+class RouteResult:
+    name: str
+    method: str
+    path: str
+    iterations: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    queries: int
+    max_queries: int
+    throughput_rps: float | None = None
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.queries > self.max_queries
+
+
+def _new_task() -> dict:
+    return {'title': 'benchmark', 'deadline': date.today().isoformat(), 'is_active': True}
+
+
+def _new_employee() -> dict:
+    return {'first_name': 'Bench', 'second_name': 'Mark', 'position': 'tester'}
+
+
+async def _created_task(client: httpx.AsyncClient, context: dict) -> dict:
+    response = await client.post('/task/create', json={**_new_task(), 'employee_id': context['employee_id']})
+    return {'new_task_id': response.json()['id']}
+
+
+async def _created_employee(client: httpx.AsyncClient, context: dict) -> dict:
+    response = await client.post('/employee/create', json=_new_employee())
+    return {'new_employee_id': response.json()['id']}
+
+
+async def _created_tasks(client: httpx.AsyncClient, context: dict) -> dict:
+    response = await client.post('/task/bulk/create', json=[_new_task() for _ in range(100)])
+    return {'new_task_ids': [item['id'] for item in response.json()]}
+
+
+async def _created_employees(client: httpx.AsyncClient, context: dict) -> dict:
+    response = await client.post('/employee/bulk/create', json=[_new_employee() for _ in range(100)])
+    return {'new_employee_ids': [item['id'] for item in response.json()]}
+
+
+async def _created_job(client: httpx.AsyncClient, context: dict) -> dict:
+    response = await client.post('/jobs', json={'kind': 'task.important'})
+    return {'new_job_id': response.json()['id']}
+
+
+def build_cases() -> list[RouteCase]:
+    return [
+        RouteCase('employee list', 'GET', '/employee/list?limit=100', 2),
+        RouteCase('employee list, no tasks', 'GET', '/employee/list?limit=100&with_tasks=false', 1),
+        RouteCase('employee detail', 'GET', '/employee/detail/{employee_id}', 2),
+        RouteCase('employee engaged', 'GET', '/employee/engaged', 2),
+        RouteCase('employee search', 'GET', '/employee/search?q=ivan', 1),
+        RouteCase('employee export', 'GET', '/employee/export', 1),
+        RouteCase('employee changes', 'GET', '/employee/changes?limit=500', 2),
+        RouteCase('employee create', 'POST', '/employee/create', 1, json=_new_employee(), concurrent=False),
+        RouteCase('employee update', 'PATCH', '/employee/update/{employee_id}', 2,
+                  json={'position': 'developer'}, concurrent=False),
+        RouteCase('employee delete', 'DELETE', '/employee/delete/{new_employee_id}', 3,
+                  setup=_created_employee, concurrent=False),
+        RouteCase('employee bulk create', 'POST', '/employee/bulk/create', 1,
+                  json=[_new_employee() for _ in range(100)], concurrent=False),
+        RouteCase('employee bulk update', 'PATCH', '/employee/bulk/update', 1,
+                  json=lambda call_context: [{'id': employee_id, 'position': 'developer'}
+                                             for employee_id in call_context['new_employee_ids']],
+                  setup=_created_employees, concurrent=False),
+        RouteCase('employee bulk delete', 'POST', '/employee/bulk/delete', 3,
+                  json=lambda call_context: call_context['new_employee_ids'], setup=_created_employees,
+                  concurrent=False),
+        RouteCase('task list', 'GET', '/task/list?limit=100', 1),
+        RouteCase('task list, filtered', 'GET', '/task/list?limit=100&is_active=true&employee_id={employee_id}', 1),
+        RouteCase('task detail', 'GET', '/task/detail/{task_id}', 1),
+        RouteCase('task search', 'GET', '/task/search?q=task%2042', 1),
+        RouteCase('task tree', 'GET', '/task/{task_id}/tree?max_depth=10000&flat=true', 1),
+        RouteCase('task tree, nested', 'GET', '/task/{task_id}/tree?max_depth=100', 1),
+        RouteCase('task ancestors', 'GET', '/task/{leaf_task_id}/ancestors?max_depth=10000', 1),
+        RouteCase('task overdue', 'GET', '/task/overdue?limit=100', 1),
+        RouteCase('task due soon', 'GET', '/task/due-soon?days=7&limit=100', 1),
+        RouteCase('task deadlines', 'GET', '/task/deadlines?days=7', 1),
+        RouteCase('task important', 'GET', '/task/important', 1),
+        RouteCase('task export', 'GET', '/task/export', 1),
+        RouteCase('task changes', 'GET', '/task/changes?limit=500', 2),
+        RouteCase('task create', 'POST', '/task/create', 2, json=_new_task(), concurrent=False),
+        RouteCase('task update', 'PATCH', '/task/update/{new_task_id}', 3,
+                  json={'is_active': False}, setup=_created_task, concurrent=False),
+        RouteCase('task delete', 'DELETE', '/task/delete/{new_task_id}', 4, setup=_created_task, concurrent=False),
+        RouteCase('task bulk create', 'POST', '/task/bulk/create', 4,
+                  json=[_new_task() for _ in range(100)], concurrent=False),
+        RouteCase('task bulk update', 'PATCH', '/task/bulk/update', 4,
+                  json=lambda call_context: [{'id': task_id, 'is_active': False}
+                                             for task_id in call_context['new_task_ids']],
+                  setup=_created_tasks, concurrent=False),
+        RouteCase('task bulk delete', 'POST', '/task/bulk/delete', 4,
+                  json=lambda call_context: call_context['new_task_ids'], setup=_created_tasks, concurrent=False),
+        RouteCase('task assign', 'POST', '/task/assign', 4,
+                  json=lambda call_context: call_context['new_task_ids'], setup=_created_tasks, concurrent=False),
+        RouteCase('stats', 'GET', '/stats', 2),
+        RouteCase('stats by employee', 'GET', '/stats/employees?limit=100', 2),
+        RouteCase('stats refresh', 'POST', '/stats/refresh', 4, concurrent=False),
+        RouteCase('jobs create', 'POST', '/jobs', 1, json={'kind': 'task.important'}, concurrent=False),
+        RouteCase('jobs list', 'GET', '/jobs?limit=100', 1),
+        RouteCase('jobs detail', 'GET', '/jobs/{new_job_id}', 1, setup=_created_job),
+        RouteCase('jobs cancel', 'POST', '/jobs/{new_job_id}/cancel', 1, setup=_created_job, concurrent=False),
+        RouteCase('metrics', 'GET', '/metrics', 0),
+        RouteCase('health live', 'GET', '/health/live', 0),
+        RouteCase('health ready', 'GET', '/health/ready', 0),
+    ]
+
+
+async def discover_context() -> dict:
+    """Идентификаторы существующих строк для маршрутов с параметрами"""
+    async with async_session_maker() as session:
+        employee_id = await session.scalar(select(func.min(Employee.id)))
+        task_id = await session.scalar(select(func.min(Task.id)))
+        leaf_task_id = await session.scalar(select(func.max(Task.id)).where(Task.base_task.isnot(None)))
+    if employee_id is None or task_id is None:
+        raise SystemExit('No data: run python -m benchmarks.generator first')
+    return {'employee_id': employee_id, 'task_id': task_id, 'leaf_task_id': leaf_task_id or task_id}
+
+
+async def _call(client: httpx.AsyncClient, case: RouteCase, context: dict) -> httpx.Response:
+    path, body = await case.prepare(client, context)
+    return await client.request(case.method, path, json=body)
+
+
+async def run_case(client: httpx.AsyncClient, case: RouteCase, context: dict,
+                   iterations: int, concurrency: int) -> RouteResult:
+    timings, queries, statements = [], 0, []
+    for _ in range(iterations):
+        path, body = await case.prepare(client, context)
+        with count_queries() as counter:
+            started = time.perf_counter()
+            response = await client.request(case.method, path, json=body)
+            timings.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        if counter.count >= queries:
+            queries, statements = counter.count, counter.statements
+
+    throughput = None
+    if case.concurrent and concurrency > 1:
+        started = time.perf_counter()
+        await asyncio.gather(*(_call(client, case, context) for _ in range(concurrency * iterations)))
+        throughput = concurrency * iterations / (time.perf_counter() - started)
+
+    timings.sort()
+    return RouteResult(
+        name=case.name,
+        method=case.method,
+        path=case.path,
+        iterations=iterations,
+        mean_ms=round(statistics.mean(timings), 3),
+        p50_ms=round(statistics.median(timings), 3),
+        p95_ms=round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+        max_ms=round(timings[-1], 3),
+        queries=queries,
+        max_queries=case.max_queries,
+        throughput_rps=None if throughput is None else round(throughput, 1),
+        statements=statements,
+    )
+
+
+async def run(iterations: int, concurrency: int, use_cache: bool, only: list[str] | None) -> dict:
+    if not use_cache:
+        src.cache.cache = None
+    context = await discover_context()
+    # ASGITransport не запускает lifespan, прогрев не нужен: /health/ready должен отвечать 200
+    app.state.warm = True
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+        for case in build_cases():
+            if only and case.name not in only:
+                continue
+            result = await run_case(client, case, context, iterations, concurrency)
+            results.append(result)
+            flag = ' OVER QUERY BUDGET' if result.over_budget else ''
+            print(f'{case.name:<26} p50={result.p50_ms:8.3f}ms p95={result.p95_ms:8.3f}ms '
+                  f'queries={result.queries}/{result.max_queries}{flag}')
+    return {
+        'started_at': datetime.now().isoformat(),
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'cache': use_cache,
+        'routes': [{**vars(result), 'over_budget': result.over_budget} for result in results],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Latency, throughput and query-count benchmark for all routes')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    parser.add_argument('--only', nargs='*', help='route case names to run')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.iterations, args.concurrency, args.cache, args.only))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if any(route['over_budget'] for route in report['routes']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
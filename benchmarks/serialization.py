@@ -0,0 +1,72 @@
+"""
+Сравнение способов сериализации списка задач, без базы данных:
+поэлементная проверка моделей + json (как через response_model и JSONResponse)
+против одного вызова TypeAdapter.dump_json и ORJSON.
+
+    python -m benchmarks.serialization --tasks 50000
+"""
+import argparse
+import json
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+
+from src.tasks.schemas import TaskRead
+
+TaskRow = namedtuple('TaskRow', 'id title deadline is_active base_task employee_id version')
+TASK_LIST = TypeAdapter(List[TaskRead])
+
+
+def build_rows(count: int) -> list[TaskRow]:
+    today = date.today()
+    return [
+        TaskRow(number, f'Task {number}', today + timedelta(days=number % 90), number % 3 != 0,
+                number - 1 if number % 4 else None, number % 500 or None, number % 7 + 1)
+        for number in range(1, count + 1)
+    ]
+
+
+def per_item_json(rows: list[TaskRow]) -> bytes:
+    items = [TaskRead.model_validate(row, from_attributes=True).model_dump(mode='json') for row in rows]
+    return json.dumps(items, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode()
+
+
+def per_item_orjson(rows: list[TaskRow]) -> bytes:
+    items = [TaskRead.model_validate(row, from_attributes=True).model_dump(mode='json') for row in rows]
+    return orjson.dumps(items)
+
+
+def type_adapter(rows: list[TaskRow]) -> bytes:
+    return TASK_LIST.dump_json(TASK_LIST.validate_python(rows, from_attributes=True))
+
+
+def _best_of(function, rows, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(rows)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Task list serialization benchmark')
+    parser.add_argument('--tasks', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = build_rows(args.tasks)
+    baseline = _best_of(per_item_json, rows, args.repeat)
+    for name, function in (('per item + json', per_item_json),
+                           ('per item + orjson', per_item_orjson),
+                           ('TypeAdapter.dump_json', type_adapter)):
+        elapsed = _best_of(function, rows, args.repeat)
+        print(f'{name:<24} {elapsed:9.2f}ms  x{baseline / elapsed:.2f}')
+
+
+if __name__ == '__main__':
+    main()
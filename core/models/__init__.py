@@ -1,9 +1,18 @@
 __all__ = (
     'Base',
     'Employee',
+    'Job',
+    'StatsRefresh',
+    'SyncMixin',
     'Task',
+    'TimestampMixin',
+    'Tombstone',
+    'VersionMixin',
 )
 
-from core.models.base import Base
+from core.models.base import Base, SyncMixin, TimestampMixin, VersionMixin
 from core.models.employee import Employee
+from core.models.job import Job
+from core.models.stats_refresh import StatsRefresh
 from core.models.task import Task
+from core.models.tombstone import Tombstone
@@ -1,3 +1,6 @@
+from datetime import datetime
+
+from sqlalchemy import TIMESTAMP, BigInteger, Index, func, literal_column, text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, declared_attr
 
 
@@ -9,3 +12,32 @@ class Base(DeclarativeBase):
         return f"{cls.__name__.lower()}s"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+
+
+# Номер текущей транзакции (xid8, как bigint). В отличие от now() он позволяет понять,
+# завершены ли все транзакции до него (src/sync.py)
+CURRENT_XID = text('pg_current_xact_id()::text::bigint')
+
+
+class TimestampMixin:
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), index=True)
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+class SyncMixin:
+    """Транзакция последнего изменения строки: позиция строки в инкрементальной синхронизации"""
+    change_xid: Mapped[int] = mapped_column(BigInteger, server_default=CURRENT_XID, onupdate=CURRENT_XID)
+
+    @declared_attr.directive
+    def __table_args__(cls):
+        return (Index(f'ix_{cls.__tablename__}_change_xid_id', 'change_xid', 'id'),)
+
+
+class VersionMixin:
+    """Версия строки для оптимистичных блокировок и ETag: увеличивается любым UPDATE, где ее не задали явно"""
+
+    @declared_attr
+    def version(cls) -> Mapped[int]:
+        # Имя таблицы явно: в UPDATE ... FROM с алиасом той же таблицы просто version неоднозначен
+        return mapped_column(default=1, server_default='1',
+                             onupdate=literal_column(f'{cls.__tablename__}.version') + 1)
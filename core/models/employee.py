@@ -1,23 +1,36 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String
+from sqlalchemy import String, Index, literal_column, text
+from sqlalchemy.dialects.postgresql import to_tsvector
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from core.models.base import Base
+from core.models.base import Base, SyncMixin, TimestampMixin, VersionMixin
 
 if TYPE_CHECKING:
     from core.models.task import Task
 
 
-class Employee(Base):
+class Employee(VersionMixin, SyncMixin, TimestampMixin, Base):
     first_name: Mapped[str] = mapped_column(String(30))
     second_name: Mapped[str] = mapped_column(String(50))
     position: Mapped[str] = mapped_column(String(20))
+    active_tasks_count: Mapped[int] = mapped_column(default=0, server_default='0', index=True)
 
     tasks: Mapped[list['Task']] = relationship(back_populates='employee')
 
+    @classmethod
+    def full_name(cls):
+        """Имя и фамилия одной строкой - то же выражение, что в поисковых индексах"""
+        return cls.first_name + literal_column("' '") + cls.second_name
+
     def __str__(self):
         return f'{self.first_name} {self.second_name} - {self.position} (id={self.id})'
 
     def __repr__(self):
         return f'{self.__class__.__name__} (id= {self.id}, name= {self.first_name} {self.second_name})'
+
+
+# Поиск по имени и фамилии (src/search.py): слова и нечеткие фрагменты
+Index('ix_employees_full_name_tsv', to_tsvector(text("'simple'"), Employee.full_name()), postgresql_using='gin')
+Index('ix_employees_full_name_trgm', Employee.full_name().label('full_name'), postgresql_using='gin',
+      postgresql_ops={'full_name': 'gin_trgm_ops'})
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import String, Text, TIMESTAMP, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.models.base import Base
+
+
+class Job(Base):
+    """Фоновая задача в очереди: обрабатывается любым экземпляром приложения"""
+    kind: Mapped[str] = mapped_column(String(50))
+    payload: Mapped[Any] = mapped_column(JSONB, nullable=True)
+    status: Mapped[str] = mapped_column(String(20), server_default='queued', index=True)
+    attempts: Mapped[int] = mapped_column(server_default='0')
+    max_attempts: Mapped[int]
+    # Когда задачу можно взять: момент повтора для queued, конец аренды воркера для running
+    run_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
+    result: Mapped[Any] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_jobs_pending_run_at', 'run_at', postgresql_where=status.in_(('queued', 'running'))),
+    )
+
+    def __repr__(self):
+        return f'{self.__class__.__name__} (id= {self.id}, kind= {self.kind}, status= {self.status})'
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import String, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.models.base import Base
+
+
+class StatsRefresh(Base):
+    """Время последнего обновления материализованного представления со статистикой"""
+    __tablename__ = 'stats_refreshes'
+
+    view: Mapped[str] = mapped_column(String(50), unique=True)
+    refreshed_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f'{self.__class__.__name__} (view= {self.view}, refreshed_at= {self.refreshed_at})'
@@ -1,22 +1,23 @@
 from datetime import date
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, BOOLEAN, TIMESTAMP, ForeignKey
+from sqlalchemy import String, BOOLEAN, TIMESTAMP, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import to_tsvector
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from core.models.base import Base
+from core.models.base import Base, SyncMixin, TimestampMixin, VersionMixin
 
 if TYPE_CHECKING:
     from core.models.employee import Employee
 
 
-class Task(Base):
+class Task(VersionMixin, SyncMixin, TimestampMixin, Base):
     title: Mapped[str] = mapped_column(String(100), nullable=False)
     deadline: Mapped[date] = mapped_column(TIMESTAMP)
-    is_active: Mapped[bool] = mapped_column(BOOLEAN, default=True)
+    is_active: Mapped[bool] = mapped_column(BOOLEAN, default=True, index=True)
 
-    base_task: Mapped[int | None] = mapped_column(ForeignKey('tasks.id'), nullable=True)
-    employee_id: Mapped[int | None] = mapped_column(ForeignKey('employees.id'), nullable=True)
+    base_task: Mapped[int | None] = mapped_column(ForeignKey('tasks.id'), nullable=True, index=True)
+    employee_id: Mapped[int | None] = mapped_column(ForeignKey('employees.id'), nullable=True, index=True)
 
     parent_task: Mapped['Task'] = relationship('Task', remote_side='Task.id', backref='subtasks')
     employee: Mapped['Employee'] = relationship(back_populates='tasks')
@@ -26,3 +27,11 @@ class Task(Base):
 
     def __repr__(self):
         return f'{self.__class__.__name__} (id= {self.id}, title= {self.title})'
+
+
+# Частичный индекс для выборок по сроку: просроченные и скоро истекающие задачи ищутся только среди активных
+Index('ix_tasks_active_deadline', Task.deadline, postgresql_where=Task.is_active)
+
+# Поиск по названию (src/search.py): слова и нечеткие фрагменты
+Index('ix_tasks_title_tsv', to_tsvector(text("'simple'"), Task.title), postgresql_using='gin')
+Index('ix_tasks_title_trgm', Task.title, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
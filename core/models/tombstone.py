@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import String, TIMESTAMP, BigInteger, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.models.base import Base, CURRENT_XID
+
+
+class Tombstone(Base):
+    """Запись об удаленной строке для инкрементальной синхронизации клиентов"""
+    entity: Mapped[str] = mapped_column(String(20))
+    entity_id: Mapped[int]
+    deleted_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now())
+    change_xid: Mapped[int] = mapped_column(BigInteger, server_default=CURRENT_XID)
+
+    __table_args__ = (Index('ix_tombstones_entity_change_xid_id', 'entity', 'change_xid', 'id'),)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__} (id= {self.id}, {self.entity}= {self.entity_id})'
@@ -0,0 +1,39 @@
+"""search indexes
+
+Revision ID: 0c9d4e6f2a18
+Revises: f1a8c3d5e7b0
+Create Date: 2026-10-18 21:02:36.457190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c9d4e6f2a18'
+down_revision: Union[str, None] = 'f1a8c3d5e7b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_tasks_title_tsv', 'tasks', [sa.text("to_tsvector('simple', title)")], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_tasks_title_trgm', 'tasks', ['title'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_employees_full_name_tsv', 'employees',
+                    [sa.text("to_tsvector('simple', first_name || ' ' || second_name)")], unique=False,
+                    postgresql_using='gin')
+    op.create_index('ix_employees_full_name_trgm', 'employees',
+                    [sa.text("(first_name || ' ' || second_name) gin_trgm_ops")], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_employees_full_name_trgm', table_name='employees')
+    op.drop_index('ix_employees_full_name_tsv', table_name='employees')
+    op.drop_index('ix_tasks_title_trgm', table_name='tasks')
+    op.drop_index('ix_tasks_title_tsv', table_name='tasks')
@@ -0,0 +1,26 @@
+"""change feed sequence
+
+Revision ID: 5e2b7c9a4d61
+Revises: d3a81f6c0b27
+Create Date: 2026-10-18 14:27:05.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b7c9a4d61'
+down_revision: Union[str, None] = 'd3a81f6c0b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('change_feed_seq')))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('change_feed_seq')))
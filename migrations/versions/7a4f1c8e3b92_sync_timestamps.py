@@ -0,0 +1,44 @@
+"""sync timestamps
+
+Revision ID: 7a4f1c8e3b92
+Revises: 5e2b7c9a4d61
+Create Date: 2026-10-18 16:12:47.381250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4f1c8e3b92'
+down_revision: Union[str, None] = '5e2b7c9a4d61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('employees', 'tasks'):
+        op.add_column(table, sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False))
+        op.add_column(table, sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False))
+        op.create_index(op.f(f'ix_{table}_created_at'), table, ['created_at'], unique=False)
+        op.create_index(f'ix_{table}_updated_at_id', table, ['updated_at', 'id'], unique=False)
+    op.create_table('tombstones',
+                    sa.Column('entity', sa.String(length=20), nullable=False),
+                    sa.Column('entity_id', sa.Integer(), nullable=False),
+                    sa.Column('deleted_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+                    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+                    sa.PrimaryKeyConstraint('id')
+                    )
+    op.create_index('ix_tombstones_entity_deleted_at_id', 'tombstones', ['entity', 'deleted_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tombstones_entity_deleted_at_id', table_name='tombstones')
+    op.drop_table('tombstones')
+    for table in ('tasks', 'employees'):
+        op.drop_index(f'ix_{table}_updated_at_id', table_name=table)
+        op.drop_index(op.f(f'ix_{table}_created_at'), table_name=table)
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'created_at')
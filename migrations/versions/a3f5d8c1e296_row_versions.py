@@ -0,0 +1,28 @@
+"""row versions
+
+Revision ID: a3f5d8c1e296
+Revises: 0c9d4e6f2a18
+Create Date: 2026-10-18 21:04:19.527134
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f5d8c1e296'
+down_revision: Union[str, None] = '0c9d4e6f2a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('employees', 'tasks'):
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    for table in ('tasks', 'employees'):
+        op.drop_column(table, 'version')
@@ -0,0 +1,27 @@
+"""task active deadline index
+
+Revision ID: b6d2e9f41a73
+Revises: 7a4f1c8e3b92
+Create Date: 2026-10-18 17:05:31.920416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2e9f41a73'
+down_revision: Union[str, None] = '7a4f1c8e3b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_active_deadline', 'tasks', ['deadline'], unique=False,
+                    postgresql_where=sa.text('is_active'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_active_deadline', table_name='tasks')
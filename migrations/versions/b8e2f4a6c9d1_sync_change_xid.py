@@ -0,0 +1,40 @@
+"""sync change xid
+
+Revision ID: b8e2f4a6c9d1
+Revises: a3f5d8c1e296
+Create Date: 2026-10-18 23:41:08.214675
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f4a6c9d1'
+down_revision: Union[str, None] = 'a3f5d8c1e296'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CURRENT_XID = sa.text('pg_current_xact_id()::text::bigint')
+
+
+def upgrade() -> None:
+    for table in ('employees', 'tasks'):
+        op.add_column(table, sa.Column('change_xid', sa.BigInteger(), server_default=CURRENT_XID, nullable=False))
+        op.create_index(f'ix_{table}_change_xid_id', table, ['change_xid', 'id'], unique=False)
+        op.drop_index(f'ix_{table}_updated_at_id', table_name=table)
+    op.add_column('tombstones', sa.Column('change_xid', sa.BigInteger(), server_default=CURRENT_XID, nullable=False))
+    op.create_index('ix_tombstones_entity_change_xid_id', 'tombstones', ['entity', 'change_xid', 'id'], unique=False)
+    op.drop_index('ix_tombstones_entity_deleted_at_id', table_name='tombstones')
+
+
+def downgrade() -> None:
+    op.create_index('ix_tombstones_entity_deleted_at_id', 'tombstones', ['entity', 'deleted_at', 'id'], unique=False)
+    op.drop_index('ix_tombstones_entity_change_xid_id', table_name='tombstones')
+    op.drop_column('tombstones', 'change_xid')
+    for table in ('tasks', 'employees'):
+        op.create_index(f'ix_{table}_updated_at_id', table, ['updated_at', 'id'], unique=False)
+        op.drop_index(f'ix_{table}_change_xid_id', table_name=table)
+        op.drop_column(table, 'change_xid')
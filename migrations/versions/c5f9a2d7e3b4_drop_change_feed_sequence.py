@@ -0,0 +1,26 @@
+"""drop change feed sequence
+
+Revision ID: c5f9a2d7e3b4
+Revises: b8e2f4a6c9d1
+Create Date: 2026-10-19 10:12:47.530218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f9a2d7e3b4'
+down_revision: Union[str, None] = 'b8e2f4a6c9d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('change_feed_seq')))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('change_feed_seq')))
@@ -0,0 +1,34 @@
+"""employee active tasks count
+
+Revision ID: d3a81f6c0b27
+Revises: 9c1e5a7d2f40
+Create Date: 2026-10-18 10:03:19.552870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a81f6c0b27'
+down_revision: Union[str, None] = '9c1e5a7d2f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('employees', sa.Column('active_tasks_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        'UPDATE employees SET active_tasks_count = ('
+        'SELECT count(tasks.id) FROM tasks '
+        'WHERE tasks.employee_id = employees.id AND tasks.is_active'
+        ')'
+    )
+    op.create_index(op.f('ix_employees_active_tasks_count'), 'employees', ['active_tasks_count'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_employees_active_tasks_count'), table_name='employees')
+    op.drop_column('employees', 'active_tasks_count')
@@ -0,0 +1,70 @@
+"""workload stats
+
+Revision ID: e4c7a2b9d815
+Revises: b6d2e9f41a73
+Create Date: 2026-10-18 18:21:09.604732
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c7a2b9d815'
+down_revision: Union[str, None] = 'b6d2e9f41a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stats_refreshes',
+                    sa.Column('view', sa.String(length=50), nullable=False),
+                    sa.Column('refreshed_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'),
+                              nullable=False),
+                    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+                    sa.PrimaryKeyConstraint('id'),
+                    sa.UniqueConstraint('view')
+                    )
+    # Глубина задачи в дереве: 0 у корневой, +1 на каждый уровень вложенности.
+    # Задачи из циклов без корня недостижимы и в среднее не попадают.
+    op.execute(
+        'CREATE MATERIALIZED VIEW employee_stats AS '
+        'WITH RECURSIVE task_depth(id, depth) AS ('
+        'SELECT id, 0 FROM tasks WHERE base_task IS NULL '
+        'UNION ALL '
+        'SELECT tasks.id, task_depth.depth + 1 FROM tasks JOIN task_depth ON tasks.base_task = task_depth.id'
+        ') '
+        'SELECT employees.id AS employee_id, employees.first_name, employees.second_name, employees.position, '
+        'count(tasks.id) FILTER (WHERE tasks.is_active) AS active_tasks, '
+        'count(tasks.id) FILTER (WHERE NOT tasks.is_active) AS finished_tasks, '
+        'count(tasks.id) FILTER (WHERE tasks.is_active AND tasks.deadline < CURRENT_DATE) AS overdue_tasks, '
+        'coalesce(sum(task_depth.depth), 0)::bigint AS depth_sum, '
+        'count(task_depth.depth) AS depth_count '
+        'FROM employees '
+        'LEFT JOIN tasks ON tasks.employee_id = employees.id '
+        'LEFT JOIN task_depth ON task_depth.id = tasks.id '
+        'GROUP BY employees.id '
+        'WITH DATA'
+    )
+    # REFRESH ... CONCURRENTLY требует уникальный индекс по всем строкам
+    op.execute('CREATE UNIQUE INDEX ix_employee_stats_employee_id ON employee_stats (employee_id)')
+    op.execute('CREATE INDEX ix_employee_stats_position ON employee_stats (position, employee_id)')
+    op.execute(
+        'CREATE MATERIALIZED VIEW position_stats AS '
+        'SELECT position, count(*) AS employees, '
+        'sum(active_tasks)::bigint AS active_tasks, sum(finished_tasks)::bigint AS finished_tasks, '
+        'sum(overdue_tasks)::bigint AS overdue_tasks, sum(depth_sum)::bigint AS depth_sum, '
+        'sum(depth_count)::bigint AS depth_count '
+        'FROM employee_stats GROUP BY position '
+        'WITH DATA'
+    )
+    op.execute('CREATE UNIQUE INDEX ix_position_stats_position ON position_stats (position)')
+    op.execute("INSERT INTO stats_refreshes (view) VALUES ('employee_stats')")
+
+
+def downgrade() -> None:
+    op.execute('DROP MATERIALIZED VIEW position_stats')
+    op.execute('DROP MATERIALIZED VIEW employee_stats')
+    op.drop_table('stats_refreshes')
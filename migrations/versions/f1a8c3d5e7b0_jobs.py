@@ -0,0 +1,47 @@
+"""jobs
+
+Revision ID: f1a8c3d5e7b0
+Revises: e4c7a2b9d815
+Create Date: 2026-10-18 19:40:52.118374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a8c3d5e7b0'
+down_revision: Union[str, None] = 'e4c7a2b9d815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('jobs',
+                    sa.Column('kind', sa.String(length=50), nullable=False),
+                    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+                    sa.Column('status', sa.String(length=20), server_default='queued', nullable=False),
+                    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+                    sa.Column('max_attempts', sa.Integer(), nullable=False),
+                    sa.Column('run_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+                    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+                    sa.Column('error', sa.Text(), nullable=True),
+                    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'),
+                              nullable=False),
+                    sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=True),
+                    sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+                    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+                    sa.PrimaryKeyConstraint('id')
+                    )
+    op.create_index(op.f('ix_jobs_status'), 'jobs', ['status'], unique=False)
+    op.create_index('ix_jobs_pending_run_at', 'jobs', ['run_at'], unique=False,
+                    postgresql_where=sa.text("status IN ('queued', 'running')"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_pending_run_at', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_status'), table_name='jobs')
+    op.drop_table('jobs')
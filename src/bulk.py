@@ -0,0 +1,45 @@
+from typing import Annotated, Iterable, List, TypeVar
+
+from fastapi import Body
+from pydantic import BaseModel
+from sqlalchemy import select, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models.base import Base
+
+# asyncpg принимает не больше 32767 параметров в запросе, а UPDATE ... FROM (VALUES ...)
+# для задач передает до 6 параметров на строку
+BULK_MAX_ITEMS = 5000
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: int | None = None
+    success: bool = True
+    error: str | None = None
+
+
+T = TypeVar('T')
+BulkItems = Annotated[List[T], Body(min_length=1, max_length=BULK_MAX_ITEMS)]
+
+
+def id_array(ids: Iterable[int]):
+    """Параметр-массив id для условий вида id = ANY(:ids)"""
+    return any_(bindparam('ids', list(ids), type_=ARRAY(Integer), unique=True))
+
+
+async def existing_ids(model: type[Base], ids: Iterable[int], session: AsyncSession) -> set[int]:
+    """Возвращает те id из переданных, которые есть в таблице модели"""
+    ids = set(ids)
+    if not ids:
+        return set()
+    stmt = select(model.id).where(model.id == id_array(ids))
+    result: Result = await session.execute(stmt)
+    return set(result.scalars().all())
+
+
+def failed(index: int, error: str, item_id: int | None = None) -> BulkItemResult:
+    """Результат по элементу пакета, который не удалось обработать"""
+    return BulkItemResult(index=index, id=item_id, success=False, error=error)
@@ -0,0 +1,140 @@
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Protocol
+
+import orjson
+from pydantic import TypeAdapter
+
+from src.config import settings
+from src.metrics import Counter
+from src.singleflight import call_key, flights
+
+TASKS_TAG = 'tasks'
+EMPLOYEES_TAG = 'employees'
+
+cache_hits = Counter('cache_hits_total', 'Cached service calls answered from cache')
+cache_misses = Counter('cache_misses_total', 'Cached service calls that went to the database')
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def get_versions(self, tags: tuple[str, ...]) -> list[int]: ...
+
+    async def bump_versions(self, tags: tuple[str, ...]) -> None: ...
+
+
+class MemoryCache:
+    """Кэш в памяти процесса: TTL + вытеснение давно не использованных записей"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_versions(self, tags: tuple[str, ...]) -> list[int]:
+        return [self._versions.get(tag, 0) for tag in tags]
+
+    async def bump_versions(self, tags: tuple[str, ...]) -> None:
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+
+
+class RedisCache:
+    """Кэш в Redis (или совместимом сервере), общий для всех процессов"""
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError('CACHE_BACKEND=redis requires the "redis" package') from exc
+        self.client = redis.Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(f'cache:{key}')
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(f'cache:{key}', value, px=int(ttl * 1000))
+
+    async def get_versions(self, tags: tuple[str, ...]) -> list[int]:
+        versions = await self.client.mget([f'cache:version:{tag}' for tag in tags])
+        return [int(version or 0) for version in versions]
+
+    async def bump_versions(self, tags: tuple[str, ...]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f'cache:version:{tag}')
+            await pipe.execute()
+
+
+def build_cache() -> CacheBackend | None:
+    if settings.cache_backend == 'none':
+        return None
+    if settings.cache_backend == 'redis':
+        return RedisCache(settings.cache_url)
+    return MemoryCache(settings.cache_max_entries)
+
+
+cache: CacheBackend | None = build_cache()
+
+
+def cached(*tags: str, adapter: TypeAdapter, ttl: float | None = None):
+    """
+    Кэширует результат сервисной функции в сериализованном виде.
+    Ключ - имя функции, ее аргументы (кроме сессии), источник чтения (реплика или
+    основная база) и текущие версии тегов, поэтому запись по любому из тегов делает
+    старые записи недостижимыми.
+    """
+
+    def decorator(func: Callable):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            if cache is None:
+                return await func(*args, **kwargs)
+            versions = await cache.get_versions(tags)
+            key = f'{call_key(func, signature, args, kwargs)}:{versions}'
+
+            value = await cache.get(key)
+            if value is not None:
+                cache_hits.inc()
+                return orjson.loads(value)
+
+            cache_misses.inc()
+            result = adapter.validate_python(await func(*args, **kwargs), from_attributes=True)
+            result = adapter.dump_python(result, mode='json')
+            await cache.set(key, orjson.dumps(result), settings.cache_ttl if ttl is None else ttl)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate(*tags: str) -> None:
+    """Сбрасывает кэш всех функций, зависящих от тегов"""
+    flights.forget(tags)
+    if cache is not None:
+        await cache.bump_versions(tags)
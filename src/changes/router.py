@@ -0,0 +1,67 @@
+import asyncio
+from contextlib import suppress
+
+import orjson
+from fastapi import APIRouter, Header, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from src.changes.services import broadcaster
+
+SSE_HEARTBEAT_SECONDS = 15
+
+router = APIRouter(
+    prefix='/changes',
+    tags=['Changes']
+)
+
+
+async def _sse_events(since: int | None):
+    """События в формате Server-Sent Events, с комментарием-пингом при простое"""
+    changes = broadcaster.subscribe(since)
+    next_change = asyncio.ensure_future(anext(changes))
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_change}, timeout=SSE_HEARTBEAT_SECONDS)
+            if not done:
+                yield b': ping\n\n'
+                continue
+            try:
+                change = next_change.result()
+            except StopAsyncIteration:
+                return
+            yield (f"id: {change['seq']}\nevent: {change['entity']}.{change['action']}\n".encode()
+                   + b'data: ' + orjson.dumps(change) + b'\n\n')
+            next_change = asyncio.ensure_future(anext(changes))
+    finally:
+        next_change.cancel()
+        with suppress(asyncio.CancelledError, StopAsyncIteration):
+            await next_change
+        await changes.aclose()
+
+
+@router.get('/stream')
+async def stream_changes(since: int | None = Query(default=None, description='Номер последнего полученного события'),
+                         last_event_id: int | None = Header(default=None)):
+    """
+    Поток изменений задач и сотрудников (Server-Sent Events).
+    Возобновление - по параметру since или заголовку Last-Event-ID.
+    """
+    return StreamingResponse(
+        _sse_events(since if since is not None else last_event_id),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@router.websocket('/ws')
+async def websocket_changes(websocket: WebSocket, since: int | None = None):
+    """Поток изменений задач и сотрудников через WebSocket, с возобновлением по since"""
+    await websocket.accept()
+    changes = broadcaster.subscribe(since)
+    try:
+        async for change in changes:
+            await websocket.send_bytes(orjson.dumps(change))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await changes.aclose()
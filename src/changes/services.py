@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator
+
+import orjson
+from sqlalchemy import Integer, Text, cast, event, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'task_tracker_changes'
+# NOTIFY ограничивает размер сообщения 8000 байт, поэтому крупные пакеты делятся
+IDS_PER_EVENT = 500
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class Broadcaster:
+    """
+    Рассылка изменений подписчикам внутри процесса. Последние события хранятся
+    в кольцевом буфере, чтобы клиент мог продолжить с номера последнего события.
+    """
+
+    def __init__(self, buffer_size: int, first_seq: int = 0):
+        self.buffer: deque[dict] = deque(maxlen=buffer_size)
+        self.subscribers: set[asyncio.Queue] = set()
+        self.last_seq = first_seq
+
+    def publish(self, change: dict) -> None:
+        self.last_seq = max(self.last_seq, change['seq'])
+        self.buffer.append(change)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(change)
+            except asyncio.QueueFull:
+                # медленный клиент отключается и переподключится с последнего полученного номера
+                self.subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    def publish_local(self, entity: str, action: str, ids: list[int]) -> None:
+        self.publish({'seq': self.last_seq + 1, 'entity': entity, 'action': action, 'ids': ids, 'at': time.time()})
+
+    def oldest_known_seq(self) -> int:
+        """Номер, начиная с которого процесс знает все события (дальше буфера - только новые)"""
+        return self.buffer[0]['seq'] if self.buffer else self.last_seq + 1
+
+    async def subscribe(self, since: int | None = None) -> AsyncIterator[dict]:
+        """
+        События с номером больше since (из буфера), затем новые. Если буфер не покрывает
+        since (события вытеснены, были до перезапуска или номер из другого запуска),
+        первым приходит событие reset.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        try:
+            if since is not None:
+                oldest = self.oldest_known_seq()
+                if since + 1 < oldest or since > self.last_seq:
+                    since = oldest - 1
+                    yield {'seq': since, 'entity': 'feed', 'action': 'reset', 'ids': []}
+                for change in list(self.buffer):
+                    if change['seq'] > since:
+                        since = change['seq']
+                        yield change
+            while True:
+                change = await queue.get()
+                if change is None:
+                    return
+                if since is None or change['seq'] > since:
+                    yield change
+        finally:
+            self.subscribers.discard(queue)
+
+
+# Номера событий назначает сам процесс в порядке поступления и не переживают перезапуск: нумерация
+# каждого запуска начинается с времени запуска в микросекундах, так что номера нового запуска больше прежних,
+# а клиент с номером из прошлого запуска или другого экземпляра получает reset
+broadcaster = Broadcaster(settings.change_feed_buffer, first_seq=int(time.time() * 1_000_000))
+
+
+def _chunks(ids: list[int]):
+    for start in range(0, len(ids), IDS_PER_EVENT):
+        yield ids[start:start + IDS_PER_EVENT]
+
+
+async def record_change(session: AsyncSession, entity: str, action: str, ids: list[int]) -> None:
+    """
+    Регистрирует изменение в текущей транзакции (вызывается до коммита).
+    Подписчики получают событие только после успешного коммита. Номер события здесь не берется:
+    номер из транзакции опережал бы коммит, и события приходили бы не по порядку номеров
+    """
+    if not ids:
+        return
+    if settings.change_feed_backend == 'postgres':
+        for chunk in _chunks(ids):
+            payload = func.json_build_object(
+                'entity', entity, 'action', action,
+                'ids', literal(chunk, ARRAY(Integer)), 'at', func.extract('epoch', func.now()),
+            )
+            await session.execute(select(func.pg_notify(CHANNEL, cast(payload, Text))))
+        return
+    session.info.setdefault('pending_changes', []).extend(
+        (entity, action, chunk) for chunk in _chunks(ids)
+    )
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_pending_changes(session: Session) -> None:
+    for entity, action, ids in session.info.pop('pending_changes', []):
+        broadcaster.publish_local(entity, action, ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_pending_changes(session: Session) -> None:
+    session.info.pop('pending_changes', None)
+
+
+class PostgresListener:
+    """
+    LISTEN на канале изменений: события всех экземпляров приложения попадают в локальный broadcaster.
+    NOTIFY доставляется в порядке коммитов, поэтому события нумеруются при получении
+    """
+
+    def __init__(self):
+        self.connection = None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        broadcaster.publish({'seq': broadcaster.last_seq + 1, **orjson.loads(payload)})
+
+    async def start(self) -> None:
+        import asyncpg
+
+        self.connection = await asyncpg.connect(
+            user=settings.db_user, password=settings.db_pass, host=settings.db_host,
+            port=settings.db_port, database=settings.db_name,
+        )
+        await self.connection.add_listener(CHANNEL, self._on_notify)
+        logger.info('Listening for changes on channel %s', CHANNEL)
+
+    async def stop(self) -> None:
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+
+
+listener = PostgresListener()
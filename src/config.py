@@ -1,10 +1,82 @@
-from dotenv import load_dotenv
-import os
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-load_dotenv()
 
-DB_NAME = os.environ.get('DB_NAME')
-DB_USER = os.environ.get('DB_USER')
-DB_PASS = os.environ.get('DB_PASS')
-DB_HOST = os.environ.get('DB_HOST')
-DB_PORT = os.environ.get('DB_PORT')
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file='.env', extra='ignore')
+
+    db_name: str = ''
+    db_user: str = ''
+    db_pass: str = ''
+    db_host: str = 'localhost'
+    db_port: str = '5432'
+
+    # Пул соединений
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = False
+    # NullPool - соединение на каждый запрос, для работы за pgbouncer
+    db_null_pool: bool = False
+
+    # Параметры asyncpg
+    db_statement_cache_size: int = 100
+    db_command_timeout: float | None = None
+
+    # Реплика для чтения (полный URL postgresql+asyncpg://...): запросы чтения используют SQL только для PostgreSQL
+    db_replica_url: str | None = None
+    # Сколько секунд после записи клиент читает с основной базы
+    read_your_writes_window: float = 5
+
+    # Кэш ответов: memory, redis или none
+    cache_backend: str = 'memory'
+    cache_url: str | None = None
+    cache_ttl: float = 30
+    cache_max_entries: int = 1024
+    # Сколько секунд одинаковый вызов ждет уже выполняющийся запрос, прежде чем выполнить свой
+    singleflight_timeout: float = 5
+
+    # Замеры SQL и времени по запросам (Server-Timing, метрики, лог медленных запросов)
+    instrumentation_enabled: bool = False
+    slow_query_threshold_ms: float = 200
+
+    # Лента изменений: memory (один процесс) или postgres (LISTEN/NOTIFY между экземплярами)
+    change_feed_backend: str = 'memory'
+    change_feed_buffer: int = 10000
+
+    # Статистика нагрузки (/stats): через сколько секунд представление пересчитывается в фоне
+    stats_max_age_seconds: float = 60
+
+    # Очередь фоновых задач: число воркеров в процессе (0 - только постановка в очередь),
+    # аренда задачи воркером, повторы с экспоненциальной задержкой
+    jobs_workers: int = 2
+    jobs_poll_interval: float = 1
+    jobs_lease_seconds: float = 60
+    jobs_max_attempts: int = 3
+    jobs_retry_backoff_seconds: float = 5
+    jobs_retry_backoff_max_seconds: float = 300
+    jobs_shutdown_timeout: float = 30
+
+    # Запуск в продакшене (python -m src.server): число процессов по умолчанию - число ядер
+    web_host: str = '0.0.0.0'
+    web_port: int = 8000
+    web_workers: int | None = None
+    web_forwarded_allow_ips: str = '127.0.0.1'
+    web_graceful_shutdown: int = 30
+    web_access_log: bool = True
+    # Прогрев при старте: соединения пула и подготовленные выражения частых запросов
+    warmup_enabled: bool = True
+    warmup_retry_interval: float = 5
+
+    @property
+    def database_url(self) -> str:
+        return f"postgresql+asyncpg://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}"
+
+
+settings = Settings()
+
+DB_NAME = settings.db_name
+DB_USER = settings.db_user
+DB_PASS = settings.db_pass
+DB_HOST = settings.db_host
+DB_PORT = settings.db_port
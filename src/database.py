@@ -1,19 +1,116 @@
+import time
 from typing import AsyncGenerator
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-from src.config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from src.config import settings
+from src.instrumentation import instrument_engine, record_pool_wait
+from src.metrics import Gauge, Histogram
 
-DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = settings.database_url
 Base = declarative_base()
 
+# метка в session.info сессий реплики: по ней кэш не смешивает данные реплики и основной базы
+REPLICA_SESSION = 'replica'
 
-engine = create_async_engine(DATABASE_URL)
+pool_checkout_wait = Histogram('db_pool_checkout_wait_seconds', 'Time spent waiting for a pool connection')
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, замеряющий время ожидания свободного соединения"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            pool_checkout_wait.observe(waited)
+            record_pool_wait(waited)
+
+
+def engine_url(url: str = DATABASE_URL) -> str:
+    """URL движка с размером кэша подготовленных запросов на стороне SQLAlchemy"""
+    return f'{url}?prepared_statement_cache_size={settings.db_statement_cache_size}'
+
+
+def engine_options() -> dict:
+    """Параметры движка и пула соединений из настроек"""
+    connect_args = {'statement_cache_size': settings.db_statement_cache_size}
+    if settings.db_command_timeout is not None:
+        connect_args['command_timeout'] = settings.db_command_timeout
+    options = {
+        'connect_args': connect_args,
+        'pool_pre_ping': settings.db_pool_pre_ping,
+    }
+    if settings.db_null_pool:
+        options['poolclass'] = NullPool
+    else:
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    return options
+
+
+engine = create_async_engine(engine_url(), **engine_options())
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+if not settings.db_null_pool:
+    Gauge('db_pool_size', 'Configured pool size', lambda: engine.pool.size())
+    Gauge('db_pool_checked_out', 'Connections currently checked out', lambda: engine.pool.checkedout())
+    Gauge('db_pool_overflow', 'Overflow connections currently open', lambda: engine.pool.overflow())
+
+
+if settings.db_replica_url:
+    read_engine = create_async_engine(engine_url(settings.db_replica_url), **engine_options())
+    read_session_maker = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False,
+                                      info={REPLICA_SESSION: True})
+else:
+    read_engine = engine
+    read_session_maker = async_session_maker
+
+if settings.instrumentation_enabled:
+    instrument_engine(engine)
+    if read_engine is not engine:
+        instrument_engine(read_engine)
+
+LAST_WRITE_COOKIE = 'last_write_at'
+READ_ONLY_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
+
+
+def _wrote_recently(request: Request) -> bool:
+    """Была ли у клиента запись в пределах окна read-your-writes"""
+    try:
+        last_write_at = float(request.cookies.get(LAST_WRITE_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() - last_write_at < settings.read_your_writes_window
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия для чтения: реплика, либо основная база, если клиент только что писал"""
+    session_maker = async_session_maker if _wrote_recently(request) else read_session_maker
+    async with session_maker() as session:
+        yield session
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """Помечает клиента после успешной записи, чтобы его чтения шли в основную базу"""
+    response = await call_next(request)
+    if request.method not in READ_ONLY_METHODS and response.status_code < 400:
+        response.set_cookie(LAST_WRITE_COOKIE, str(time.time()), max_age=int(settings.read_your_writes_window) + 1,
+                            httponly=True)
+    return response
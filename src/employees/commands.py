@@ -0,0 +1,40 @@
+"""
+Проверка и исправление счетчиков активных задач сотрудников.
+
+    python -m src.employees.commands check
+    python -m src.employees.commands repair
+"""
+import argparse
+import asyncio
+import sys
+
+from src.database import async_session_maker
+from src.employees.services import check_active_tasks_counts, repair_active_tasks_counts
+
+
+async def check() -> int:
+    async with async_session_maker() as session:
+        mismatches = await check_active_tasks_counts(session)
+    for employee_id, stored, actual in mismatches:
+        print(f'employee id={employee_id}: counter={stored}, actual={actual}')
+    print(f'Mismatches found: {len(mismatches)}')
+    return 1 if mismatches else 0
+
+
+async def repair() -> int:
+    async with async_session_maker() as session:
+        fixed = await repair_active_tasks_counts(session)
+    print(f'Counters repaired: {fixed}')
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Active tasks counters consistency check')
+    parser.add_argument('command', choices=['check', 'repair'])
+    args = parser.parse_args()
+    command = check if args.command == 'check' else repair
+    sys.exit(asyncio.run(command()))
+
+
+if __name__ == '__main__':
+    main()
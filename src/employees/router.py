@@ -1,28 +1,96 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_session
+from src.bulk import BulkItems, BulkItemResult
+from src.database import get_async_session, get_read_session
 from src.employees import services
-from src.employees.schemas import EmployeeCreate, EmployeeUpdate, EmployeeRead, EmployeeReadWithTasks
+from src.etag import VersionConflict, etag, fingerprint, if_match_versions, not_modified
+from src.employees.schemas import (EmployeeCreate, EmployeeUpdate, EmployeeBulkUpdate, EmployeeRead,
+                                   EmployeeReadWithTasks, EmployeeChanges, EmployeeSearchResult)
+from src.export import ExportFormat, MEDIA_TYPES
+from src.instrumentation import InstrumentedRoute
+from src.serialization import json_response
+
+EMPLOYEE_LIST = TypeAdapter(List[EmployeeReadWithTasks])
+EMPLOYEE_CHANGES = TypeAdapter(EmployeeChanges)
+EMPLOYEE_SEARCH_RESULTS = TypeAdapter(List[EmployeeSearchResult])
+
+
+def _employee_etag(version: int, task_versions: list[tuple[int, int]]) -> str:
+    """ETag карточки сотрудника: его версия и отпечаток (id, версия) его задач, входящих в ответ /detail"""
+    return etag(version, fingerprint(task_versions))
 
 
 router = APIRouter(
     prefix='/employee',
+    route_class=InstrumentedRoute,
     tags=['Employees']
 )
 
 
 @router.get('/list', response_model=List[EmployeeReadWithTasks])
-async def get_all_employees(session: AsyncSession = Depends(get_async_session)):
-    """Общий список сотрудников"""
-    return await services.get_all_employees(session)
+async def get_all_employees(limit: int = Query(default=100, ge=1, le=1000),
+                            after: int | None = Query(default=None,
+                                                      description='id последнего сотрудника предыдущей страницы'),
+                            with_tasks: bool = Query(default=True, description='Загружать задачи сотрудников'),
+                            session: AsyncSession = Depends(get_read_session)):
+    """Общий список сотрудников (постранично, по возрастанию id)"""
+    employees = await services.get_all_employees(session, limit=limit, after=after, with_tasks=with_tasks)
+    return json_response(EMPLOYEE_LIST, employees)
+
+
+@router.get('/search', response_model=List[EmployeeSearchResult])
+async def search_employees(q: str = Query(min_length=1, max_length=200, description='Имя, фамилия или их фрагмент'),
+                           limit: int = Query(default=20, ge=1, le=100),
+                           offset: int = Query(default=0, ge=0, le=1000),
+                           position: str | None = None,
+                           session: AsyncSession = Depends(get_read_session)):
+    """Поиск сотрудников по имени и фамилии (по словам и нечеткий, с опечатками), по убыванию релевантности"""
+    employees = await services.search_employees(q, session, limit=limit, offset=offset, position=position)
+    return json_response(EMPLOYEE_SEARCH_RESULTS, employees)
+
+
+@router.get('/export')
+async def export_employees(export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias='format'),
+                           session: AsyncSession = Depends(get_read_session)):
+    """Потоковая выгрузка всех сотрудников в NDJSON или CSV"""
+    return StreamingResponse(
+        services.export_employees(session, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="employees.{export_format.value}"'}
+    )
+
+
+@router.get('/changes', response_model=EmployeeChanges)
+async def get_employee_changes(since: str | None = Query(default=None, description='next_token из предыдущего ответа'),
+                               limit: int = Query(default=500, ge=1, le=5000),
+                               session: AsyncSession = Depends(get_read_session)):
+    """
+    Изменения сотрудников с момента since: измененные строки и id удаленных.
+    Без since - полная выгрузка по страницам. Пока has_more, запрашивать дальше с next_token.
+    """
+    try:
+        changes = await services.get_employee_changes(since, limit, session)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid sync token')
+    return json_response(EMPLOYEE_CHANGES, changes)
 
 
 @router.get('/detail/{employee_id}', response_model=EmployeeReadWithTasks)
-async def get_employee(employee_id: int, session: AsyncSession = Depends(get_async_session)):
-    """Данные по одному сотруднику"""
-    return await services.get_employee(employee_id, session)
+async def get_employee(employee_id: int, response: Response, if_none_match: str | None = Header(default=None),
+                       session: AsyncSession = Depends(get_read_session)):
+    """Данные по одному сотруднику. С If-None-Match и неизменными данными - 304 без тела"""
+    employee = await services.get_employee(employee_id, session)
+    if employee is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Employee not found')
+    tag = _employee_etag(employee.version, [(task.id, task.version) for task in employee.tasks])
+    if not_modified(if_none_match, tag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': tag})
+    response.headers['ETag'] = tag
+    return employee
 
 
 @router.post('/create', response_model=EmployeeRead)
@@ -32,19 +100,55 @@ async def create_employee(new_employee: EmployeeCreate, session: AsyncSession =
 
 
 @router.patch('/update/{employee_id}', response_model=EmployeeRead)
-async def update_employee(employee_id: int, employee_update: EmployeeUpdate,
+async def update_employee(employee_id: int, employee_update: EmployeeUpdate, response: Response,
+                          if_match: str | None = Header(default=None),
                           session: AsyncSession = Depends(get_async_session)):
-    """Обновление сотрудника"""
-    return await services.update_employee(employee_id, employee_update, session)
+    """
+    Обновление сотрудника. С If-Match (ETag сотрудника) обновляет, только если
+    сотрудника не изменили с момента чтения, иначе 412
+    """
+    try:
+        employee = await services.update_employee(employee_id, employee_update, session,
+                                                  expected_versions=if_match_versions(if_match))
+    except VersionConflict:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail='Employee was modified')
+    if employee is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Employee not found')
+    # тот же ETag, что у /detail: If-None-Match после правки сравнивается с ним
+    response.headers['ETag'] = _employee_etag(employee.version, await services.get_task_versions(employee_id, session))
+    return employee
 
 
 @router.delete('/delete/{employee_id}')
 async def delete_employee(employee_id: int, session: AsyncSession = Depends(get_async_session)):
     """Удаление сотрудника"""
-    return await services.delete_employee(employee_id, session)
+    result = await services.delete_employee(employee_id, session)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Employee not found')
+    return result
+
+
+@router.post('/bulk/create', response_model=List[BulkItemResult])
+async def bulk_create_employees(new_employees: BulkItems[EmployeeCreate],
+                                session: AsyncSession = Depends(get_async_session)):
+    """Пакетное создание сотрудников"""
+    return await services.bulk_create_employees(new_employees, session)
+
+
+@router.patch('/bulk/update', response_model=List[BulkItemResult])
+async def bulk_update_employees(employees_update: BulkItems[EmployeeBulkUpdate],
+                                session: AsyncSession = Depends(get_async_session)):
+    """Пакетное обновление сотрудников"""
+    return await services.bulk_update_employees(employees_update, session)
+
+
+@router.post('/bulk/delete', response_model=List[BulkItemResult])
+async def bulk_delete_employees(employee_ids: BulkItems[int], session: AsyncSession = Depends(get_async_session)):
+    """Пакетное удаление сотрудников"""
+    return await services.bulk_delete_employees(employee_ids, session)
 
 
 @router.get('/engaged', response_model=List[EmployeeReadWithTasks])
-async def get_engaged_employees(session: AsyncSession = Depends(get_async_session)):
+async def get_engaged_employees(session: AsyncSession = Depends(get_read_session)):
     """Список занятых сотрудников, отсортированные по количеству активных задач."""
-    return await services.get_engaged_employees(session)
+    return json_response(EMPLOYEE_LIST, await services.get_engaged_employees(session))
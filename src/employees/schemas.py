@@ -1,12 +1,13 @@
+from datetime import datetime
 from typing import List
 from pydantic import BaseModel, Field
 from src.tasks.schemas import TaskRead
 
 
 class EmployeeBase(BaseModel):
-    first_name: str = Field(max_length=100)
-    second_name: str = Field(max_length=100)
-    position: str = Field(max_length=100)
+    first_name: str = Field(max_length=30)
+    second_name: str = Field(max_length=50)
+    position: str = Field(max_length=20)
 
 
 class EmployeeCreate(EmployeeBase):
@@ -14,14 +15,36 @@ class EmployeeCreate(EmployeeBase):
 
 
 class EmployeeUpdate(EmployeeCreate):
-    first_name: str | None = None
-    second_name: str | None = None
-    position: str | None = None
+    first_name: str | None = Field(default=None, max_length=30)
+    second_name: str | None = Field(default=None, max_length=50)
+    position: str | None = Field(default=None, max_length=20)
+
+
+class EmployeeBulkUpdate(EmployeeUpdate):
+    id: int
 
 
 class EmployeeRead(EmployeeBase):
     id: int
+    version: int
+    active_tasks_count: int = 0
 
 
 class EmployeeReadWithTasks(EmployeeRead):
     tasks: List[TaskRead] = []
+
+
+class EmployeeSearchResult(EmployeeRead):
+    rank: float
+
+
+class EmployeeSyncRead(EmployeeRead):
+    created_at: datetime
+    updated_at: datetime
+
+
+class EmployeeChanges(BaseModel):
+    items: List[EmployeeSyncRead]
+    deleted: List[int]
+    next_token: str
+    has_more: bool
@@ -1,20 +1,76 @@
-from sqlalchemy import select, desc
+from pydantic import TypeAdapter
+from sqlalchemy import select, insert, update, delete, desc, cast, values, column, bindparam, Integer, String
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy.engine import Result
+from sqlalchemy.engine import Result, Row
 from sqlalchemy.sql.functions import func
 
 from core.models.employee import Employee
 from core.models.task import Task
-from src.employees.schemas import EmployeeCreate, EmployeeUpdate
+from src.bulk import BulkItemResult, failed, id_array
+from src.cache import EMPLOYEES_TAG, TASKS_TAG, cached, invalidate
+from src.changes.services import record_change
+from src.employees.schemas import EmployeeCreate, EmployeeUpdate, EmployeeBulkUpdate, EmployeeReadWithTasks
+from src.etag import VersionConflict
+from src.export import ExportFormat, export_rows
+from src.search import text_search
+from src.singleflight import single_flight
+from src.sync import SyncToken, get_changes, record_tombstones
 
 
-async def get_all_employees(session: AsyncSession) -> list[Employee]:
-    """Получает список всех сотрудников"""
-    stmt = select(Employee).options(selectinload(Employee.tasks)).order_by(Employee.id)
+@cached(EMPLOYEES_TAG, TASKS_TAG, adapter=TypeAdapter(list[EmployeeReadWithTasks]))
+async def get_all_employees(session: AsyncSession, limit: int = 100, after: int | None = None,
+                            with_tasks: bool = True) -> list[dict]:
+    """Получает страницу списка сотрудников (keyset-пагинация по id)"""
+    stmt = select(Employee.__table__)
+    if after is not None:
+        stmt = stmt.where(Employee.id > after)
+    stmt = stmt.order_by(Employee.id).limit(limit)
     result: Result = await session.execute(stmt)
-    employees = result.scalars().all()
-    return list(employees)
+    employees = result.all()
+    if not with_tasks:
+        return [{**employee._asdict(), 'tasks': []} for employee in employees]
+    return await _with_tasks(employees, session)
+
+
+async def _with_tasks(employees: list[Row], session: AsyncSession) -> list[dict]:
+    """
+    Добавляет к строкам сотрудников их задачи. Задачи всей страницы читаются
+    одним запросом в виде строк, без создания ORM-объектов.
+    """
+    tasks_by_employee = {employee.id: [] for employee in employees}
+    if tasks_by_employee:
+        stmt = select(Task.__table__).where(Task.employee_id == id_array(tasks_by_employee)).order_by(Task.id)
+        result: Result = await session.execute(stmt)
+        for task in result.all():
+            tasks_by_employee[task.employee_id].append(task)
+    return [{**employee._asdict(), 'tasks': tasks_by_employee[employee.id]} for employee in employees]
+
+
+async def search_employees(query: str, session: AsyncSession, limit: int = 20, offset: int = 0,
+                           position: str | None = None) -> list[Row]:
+    """Ищет сотрудников по имени и фамилии: сначала самые релевантные"""
+    condition, rank = text_search(Employee.full_name(), query)
+    stmt = select(Employee.__table__, rank.label('rank')).where(condition)
+    if position is not None:
+        stmt = stmt.where(Employee.position == position)
+    stmt = stmt.order_by(rank.desc(), Employee.id).limit(limit).offset(offset)
+    result: Result = await session.execute(stmt)
+    return list(result.all())
+
+
+def export_employees(session: AsyncSession, export_format: ExportFormat):
+    """Выгружает всех сотрудников потоком, не держа всю таблицу в памяти"""
+    stmt = select(Employee.id, Employee.first_name, Employee.second_name, Employee.position).order_by(Employee.id)
+    return export_rows(stmt, session, export_format)
+
+
+async def get_employee_changes(token: str | None, limit: int, session: AsyncSession) -> dict:
+    """Получает страницу сотрудников, измененных и удаленных после позиции token"""
+    employees, deleted, next_token, has_more = await get_changes(
+        Employee.__table__, 'employee', SyncToken.decode(token), limit, session
+    )
+    return {'items': employees, 'deleted': deleted, 'next_token': next_token.encode(), 'has_more': has_more}
 
 
 async def get_employee(employee_id: int, session: AsyncSession) -> Employee | None:
@@ -25,48 +81,246 @@ async def get_employee(employee_id: int, session: AsyncSession) -> Employee | No
     return employee
 
 
+async def get_task_versions(employee_id: int, session: AsyncSession) -> list[tuple[int, int]]:
+    """(id, версия) задач сотрудника - для ETag его карточки, когда сами задачи не загружены"""
+    stmt = select(Task.id, Task.version).where(Task.employee_id == employee_id)
+    result: Result = await session.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
 async def create_employee(new_employee: EmployeeCreate, session: AsyncSession) -> Employee:
     """Создает нового сотрудника"""
     employee = Employee(**new_employee.model_dump())
     session.add(employee)
+    await session.flush()
+    await record_change(session, 'employee', 'created', [employee.id])
     await session.commit()
+    await invalidate(EMPLOYEES_TAG)
     return employee
 
 
-async def update_employee(employee_id: int, employee_update: EmployeeUpdate,
-                          session: AsyncSession) -> Employee:
-    """Обновляет данные сотрудника"""
-    stmt = select(Employee).where(Employee.id == employee_id)
+async def update_employee(employee_id: int, employee_update: EmployeeUpdate, session: AsyncSession,
+                          expected_versions: list[int] | None = None) -> Employee | None:
+    """
+    Обновляет данные сотрудника одним UPDATE ... RETURNING.
+    С expected_versions обновляет, только если версия строки среди них, иначе VersionConflict.
+    """
+    update_data = employee_update.model_dump(exclude_none=True)
+    if not update_data:
+        stmt = select(Employee).where(Employee.id == employee_id)
+        result: Result = await session.execute(stmt)
+        employee = result.scalar_one_or_none()
+        if employee is not None and expected_versions is not None and employee.version not in expected_versions:
+            raise VersionConflict
+        return employee
+
+    stmt = update(Employee).where(Employee.id == employee_id).values(**update_data).returning(Employee)
+    if expected_versions is not None:
+        stmt = stmt.where(Employee.version.in_(expected_versions))
     result: Result = await session.execute(stmt)
     employee: Employee | None = result.scalar_one_or_none()
-    for key, value in employee_update.model_dump(exclude_none=True).items():
-        setattr(employee, key, value)
+    if employee is None and expected_versions is not None:
+        if await session.scalar(select(Employee.id).where(Employee.id == employee_id)):
+            raise VersionConflict
+    await record_change(session, 'employee', 'updated', [employee.id] if employee is not None else [])
     await session.commit()
+    await invalidate(EMPLOYEES_TAG)
     return employee
 
 
 async def delete_employee(employee_id: int, session: AsyncSession):
-    """Удаляет сотрудника"""
-    stmt = select(Employee).where(Employee.id == employee_id)
+    """
+    Удаляет сотрудника одним DELETE ... RETURNING.
+    Его задачи, как и раньше, остаются без исполнителя - в той же транзакции.
+    """
+    tasks, employees = Task.__table__, Employee.__table__
+    stmt = update(tasks).where(tasks.c.employee_id == employee_id).values(employee_id=None).returning(tasks.c.id)
     result: Result = await session.execute(stmt)
-    employee: Employee | None = result.scalar_one_or_none()
-    await session.delete(employee)
+    detached = result.scalars().all()
+    stmt = delete(employees).where(employees.c.id == employee_id).returning(employees.c.id)
+    result = await session.execute(stmt)
+    if result.scalar_one_or_none() is None:
+        return None
+    await record_tombstones('employee', [employee_id], session)
+    await record_change(session, 'task', 'updated', list(detached))
+    await record_change(session, 'employee', 'deleted', [employee_id])
     await session.commit()
+    await invalidate(EMPLOYEES_TAG, TASKS_TAG)
     return {'result': 'success'}
 
 
-async def get_engaged_employees(session: AsyncSession) -> list[Employee]:
+async def bulk_create_employees(new_employees: list[EmployeeCreate], session: AsyncSession) -> list[BulkItemResult]:
+    """Создает пакет сотрудников одним INSERT ... RETURNING"""
+    stmt = insert(Employee).returning(Employee.id, sort_by_parameter_order=True)
+    result: Result = await session.execute(stmt, [employee.model_dump() for employee in new_employees])
+    ids = result.scalars().all()
+    await record_change(session, 'employee', 'created', list(ids))
+    await session.commit()
+    await invalidate(EMPLOYEES_TAG)
+    return [BulkItemResult(index=index, id=employee_id) for index, employee_id in enumerate(ids)]
+
+
+async def bulk_update_employees(employees_update: list[EmployeeBulkUpdate],
+                                session: AsyncSession) -> list[BulkItemResult]:
+    """Обновляет пакет сотрудников одним UPDATE ... FROM (VALUES ...)"""
+    results: list[BulkItemResult | None] = [None] * len(employees_update)
+    rows, seen = [], set()
+    for index, item in enumerate(employees_update):
+        if item.id in seen:
+            results[index] = failed(index, 'Duplicate id in batch', item.id)
+            continue
+        seen.add(item.id)
+        rows.append((item.id, item.first_name, item.second_name, item.position))
+
+    updated = set()
+    if rows:
+        data = values(
+            column('id', Integer), column('first_name', String), column('second_name', String),
+            column('position', String), name='data'
+        ).data(rows)
+        employees = Employee.__table__
+        stmt = (
+            update(employees)
+            .where(employees.c.id == data.c.id)
+            # столбец VALUES, пустой во всех строках, Postgres считает text - типы приводятся явно
+            .values(
+                first_name=func.coalesce(cast(data.c.first_name, String), employees.c.first_name),
+                second_name=func.coalesce(cast(data.c.second_name, String), employees.c.second_name),
+                position=func.coalesce(cast(data.c.position, String), employees.c.position),
+            )
+            .returning(employees.c.id)
+        )
+        result: Result = await session.execute(stmt)
+        updated = set(result.scalars().all())
+        await record_change(session, 'employee', 'updated', sorted(updated))
+        await session.commit()
+        await invalidate(EMPLOYEES_TAG)
+
+    for index, item in enumerate(employees_update):
+        if results[index] is None:
+            results[index] = (BulkItemResult(index=index, id=item.id) if item.id in updated
+                              else failed(index, 'Employee not found', item.id))
+    return results
+
+
+async def bulk_delete_employees(employee_ids: list[int], session: AsyncSession) -> list[BulkItemResult]:
+    """
+    Удаляет пакет сотрудников одним DELETE ... WHERE id = ANY(...).
+    Их задачи остаются без исполнителя, как в delete_employee.
+    """
+    tasks, employees = Task.__table__, Employee.__table__
+    stmt = (
+        update(tasks)
+        .where(tasks.c.employee_id == id_array(employee_ids))
+        .values(employee_id=None)
+        .returning(tasks.c.id)
+    )
+    result: Result = await session.execute(stmt)
+    detached = result.scalars().all()
+    stmt = delete(employees).where(employees.c.id == id_array(employee_ids)).returning(employees.c.id)
+    result = await session.execute(stmt)
+    deleted = set(result.scalars().all())
+    if deleted:
+        await record_tombstones('employee', sorted(deleted), session)
+        await record_change(session, 'task', 'updated', sorted(detached))
+        await record_change(session, 'employee', 'deleted', sorted(deleted))
+        await session.commit()
+        await invalidate(EMPLOYEES_TAG, TASKS_TAG)
+
+    results, seen = [], set()
+    for index, employee_id in enumerate(employee_ids):
+        if employee_id in seen:
+            results.append(failed(index, 'Duplicate id in batch', employee_id))
+        elif employee_id in deleted:
+            results.append(BulkItemResult(index=index, id=employee_id))
+        else:
+            results.append(failed(index, 'Employee not found', employee_id))
+        seen.add(employee_id)
+    return results
+
+
+@single_flight(EMPLOYEES_TAG, TASKS_TAG)
+@cached(EMPLOYEES_TAG, TASKS_TAG, adapter=TypeAdapter(list[EmployeeReadWithTasks]))
+async def get_engaged_employees(session: AsyncSession) -> list[dict]:
     """Получает список занятых сотрудников, отсортированные по количеству активных задач"""
-    stmt = (select(
-        Employee,
-        func.count(Task.id).label('active_tasks_count')
-        ).join(Employee.tasks)
-        .filter(Task.is_active)
-        .group_by(Employee.id)
-        .order_by(desc('active_tasks_count'))
-        .options(selectinload(Employee.tasks))
+    stmt = (
+        select(Employee.__table__)
+        .where(Employee.active_tasks_count > 0)
+        .order_by(desc(Employee.active_tasks_count), Employee.id)
     )
 
     result: Result = await session.execute(stmt)
-    employees = result.scalars().all()
-    return list(employees)
+    return await _with_tasks(result.all(), session)
+
+
+def _keep_version() -> dict:
+    """
+    Счетчик нагрузки - производное от задач, а не правка сотрудника: версия не меняется,
+    иначе If-Match на сотрудника ломался бы от любой операции с его задачами.
+    ETag карточки сотрудника и так учитывает задачи (отпечаток их версий)
+    """
+    return {'version': Employee.__table__.c.version}
+
+
+async def change_active_tasks_count(employee_id: int | None, delta: int, session: AsyncSession) -> None:
+    """Изменяет счетчик активных задач сотрудника (без коммита)"""
+    if employee_id is None or delta == 0:
+        return
+    stmt = (
+        update(Employee)
+        .where(Employee.id == employee_id)
+        .values(active_tasks_count=Employee.active_tasks_count + delta, **_keep_version())
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
+
+
+async def change_active_tasks_counts(deltas: dict[int, int], session: AsyncSession) -> None:
+    """Изменяет счетчики активных задач нескольких сотрудников одним executemany (без коммита)"""
+    params = [{'e_id': employee_id, 'delta': delta} for employee_id, delta in deltas.items() if delta]
+    if not params:
+        return
+    employees = Employee.__table__
+    stmt = (
+        update(employees)
+        .where(employees.c.id == bindparam('e_id'))
+        .values(active_tasks_count=employees.c.active_tasks_count + bindparam('delta'), **_keep_version())
+    )
+    connection = await session.connection()
+    await connection.execute(stmt, params)
+
+
+def _actual_active_tasks_count():
+    """Подзапрос с фактическим количеством активных задач сотрудника"""
+    return (
+        select(func.count(Task.id))
+        .where(Task.employee_id == Employee.id, Task.is_active.is_(True))
+        .scalar_subquery()
+    )
+
+
+async def check_active_tasks_counts(session: AsyncSession) -> list[tuple[int, int, int]]:
+    """Возвращает сотрудников с расхождением счетчика: (id, счетчик, фактическое значение)"""
+    actual = _actual_active_tasks_count()
+    stmt = (
+        select(Employee.id, Employee.active_tasks_count, actual)
+        .where(Employee.active_tasks_count != actual)
+        .order_by(Employee.id)
+    )
+    result: Result = await session.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
+async def repair_active_tasks_counts(session: AsyncSession) -> int:
+    """Пересчитывает счетчики активных задач, возвращает число исправленных сотрудников"""
+    actual = _actual_active_tasks_count()
+    stmt = (
+        update(Employee)
+        .where(Employee.active_tasks_count != actual)
+        .values(active_tasks_count=actual, **_keep_version())
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    await session.commit()
+    await invalidate(EMPLOYEES_TAG)
+    return result.rowcount
@@ -0,0 +1,45 @@
+import hashlib
+from typing import Iterable
+
+
+class VersionConflict(Exception):
+    """Строка изменилась после того, как клиент ее прочитал: версия не совпала с If-Match"""
+
+
+def etag(version: int, *parts: str) -> str:
+    """ETag строки: версия и, для составных ответов, отпечаток вложенных строк"""
+    return '"' + '.'.join((str(version), *parts)) + '"'
+
+
+def fingerprint(versions: Iterable[tuple[int, int]]) -> str:
+    """Короткий отпечаток набора (id, версия): меняется при изменении, добавлении или удалении строки"""
+    digest = hashlib.blake2b(digest_size=8)
+    for row_id, version in sorted(versions):
+        digest.update(f'{row_id}:{version};'.encode())
+    return digest.hexdigest()
+
+
+def if_match_versions(if_match: str | None) -> list[int] | None:
+    """
+    Версии из заголовка If-Match. None - условия нет (заголовка нет или "*"),
+    пустой список - ни один тег не может совпасть (например, только слабые W/).
+    """
+    if if_match is None or if_match.strip() == '*':
+        return None
+    versions = []
+    for tag in if_match.split(','):
+        tag = tag.strip()
+        if len(tag) > 1 and tag.startswith('"') and tag.endswith('"'):
+            version = tag[1:-1].split('.')[0]
+            if version.isdigit():
+                versions.append(int(version))
+    return versions
+
+
+def not_modified(if_none_match: str | None, current: str) -> bool:
+    """Совпадает ли один из тегов If-None-Match с текущим ETag (слабое сравнение)"""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == current for tag in if_none_match.split(','))
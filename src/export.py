@@ -0,0 +1,49 @@
+import csv
+import io
+from enum import Enum
+from typing import AsyncIterator, Sequence
+
+import orjson
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: 'application/x-ndjson',
+    ExportFormat.csv: 'text/csv',
+}
+
+
+async def stream_rows(stmt: Select, session: AsyncSession,
+                      chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[Sequence]:
+    """Читает строки запроса через серверный курсор, порциями по chunk_size"""
+    result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions():
+        yield partition
+
+
+async def export_rows(stmt: Select, session: AsyncSession, export_format: ExportFormat) -> AsyncIterator[bytes]:
+    """Отдает результат запроса кусками в формате NDJSON или CSV"""
+    columns = [column.key for column in stmt.selected_columns]
+
+    if export_format is ExportFormat.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue().encode()
+        async for partition in stream_rows(stmt, session):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(partition)
+            yield buffer.getvalue().encode()
+        return
+
+    async for partition in stream_rows(stmt, session):
+        yield b''.join(orjson.dumps(dict(zip(columns, row))) + b'\n' for row in partition)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Request, status
+from fastapi.responses import ORJSONResponse
+
+router = APIRouter(
+    prefix='/health',
+    tags=['Health']
+)
+
+
+@router.get('/live')
+async def live():
+    """Процесс запущен и отвечает"""
+    return {'status': 'alive'}
+
+
+@router.get('/ready')
+async def ready(request: Request):
+    """Процесс готов принимать трафик: пул открыт и частые запросы подготовлены"""
+    if getattr(request.app.state, 'warm', False):
+        return {'status': 'warm'}
+    return ORJSONResponse({'status': 'warming'}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,151 @@
+import asyncio
+import functools
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings
+from src.metrics import Counter, Histogram
+
+slow_query_logger = logging.getLogger('src.sql.slow')
+
+request_duration = Histogram('http_request_duration_seconds', 'Request handling time', labels=('method', 'route'))
+request_db_time = Histogram('http_request_db_seconds', 'Time spent in SQL per request', labels=('method', 'route'))
+request_queries = Histogram('http_request_queries', 'SQL statements per request', labels=('method', 'route'),
+                            buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100))
+request_serialization = Histogram('http_request_serialization_seconds', 'Response validation and rendering time',
+                                  labels=('method', 'route'))
+slow_queries = Counter('db_slow_queries_total', 'Statements slower than the configured threshold')
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+    # сериализация внутри обработчика (json_response); после него - по handler_finished_at
+    serialization: float = 0.0
+    handler_finished_at: float | None = None
+    slowest_time: float = 0.0
+    slowest_statement: str | None = None
+
+
+current_stats: ContextVar[RequestStats | None] = ContextVar('current_stats', default=None)
+
+
+def record_pool_wait(duration: float) -> None:
+    stats = current_stats.get()
+    if stats is not None:
+        stats.pool_wait += duration
+
+
+def record_serialization(duration: float) -> None:
+    stats = current_stats.get()
+    if stats is not None:
+        stats.serialization += duration
+
+
+def _record_query(statement: str, duration: float) -> None:
+    stats = current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += duration
+        if duration > stats.slowest_time:
+            stats.slowest_time, stats.slowest_statement = duration, statement
+    if duration * 1000 >= settings.slow_query_threshold_ms:
+        slow_queries.inc()
+        # внутри запроса самый медленный запрос пишется в лог вместе с маршрутом (instrumentation_middleware)
+        if stats is None:
+            slow_query_logger.warning('Slow query (%.1f ms): %s', duration * 1000, statement)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # время начала - в контексте выполнения: он живет ровно один запрос, в том числе неудавшийся
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at, context._query_started_at = context._query_started_at, None
+    _record_query(statement, time.perf_counter() - started_at)
+
+
+def _handle_error(exception_context) -> None:
+    """Неудавшийся запрос учитывается так же: after_cursor_execute для него не вызывается"""
+    started_at = getattr(exception_context.execution_context, '_query_started_at', None)
+    if started_at is not None:
+        exception_context.execution_context._query_started_at = None
+        _record_query(exception_context.statement, time.perf_counter() - started_at)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подключает замер SQL-запросов к движку"""
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine.sync_engine, 'handle_error', _handle_error)
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    Маршрут, отмечающий окончание работы обработчика: дальше идет сериализация ответа
+    через response_model. Сериализация в самом обработчике замеряется в json_response
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            super().__init__(path, endpoint, **kwargs)
+            return
+
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **endpoint_kwargs):
+            try:
+                return await endpoint(*args, **endpoint_kwargs)
+            finally:
+                stats = current_stats.get()
+                if stats is not None:
+                    stats.handler_finished_at = time.perf_counter()
+
+        super().__init__(path, timed_endpoint, **kwargs)
+
+
+def _server_timing(stats: RequestStats, serialization: float, total: float) -> str:
+    return ', '.join([
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"',
+        f'db-slowest;dur={stats.slowest_time * 1000:.2f}',
+        f'pool;dur={stats.pool_wait * 1000:.2f}',
+        f'serialize;dur={serialization * 1000:.2f}',
+        f'total;dur={total * 1000:.2f}',
+    ])
+
+
+async def instrumentation_middleware(request: Request, call_next):
+    """Собирает по запросу число SQL-запросов, время в БД, ожидание пула и сериализацию"""
+    stats = RequestStats()
+    token = current_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_stats.reset(token)
+    finished = time.perf_counter()
+
+    route = request.scope.get('route')
+    labels = {'method': request.method, 'route': route.path if route is not None else 'unmatched'}
+    serialization = stats.serialization
+    if stats.handler_finished_at is not None:
+        serialization += finished - stats.handler_finished_at
+    request_duration.observe(finished - started, **labels)
+    request_db_time.observe(stats.db_time, **labels)
+    request_queries.observe(stats.queries, **labels)
+    request_serialization.observe(serialization, **labels)
+    if stats.slowest_time * 1000 >= settings.slow_query_threshold_ms:
+        slow_query_logger.warning('Slow query in %s %s (%.1f ms, %d queries in request): %s', labels['method'],
+                                  labels['route'], stats.slowest_time * 1000, stats.queries, stats.slowest_statement)
+
+    response.headers['Server-Timing'] = _server_timing(stats, serialization, finished - started)
+    return response
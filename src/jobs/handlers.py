@@ -0,0 +1,94 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Annotated, Any, Awaitable, Callable, List
+
+from pydantic import Field, TypeAdapter
+from sqlalchemy import update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models.job import Job
+from src.bulk import BULK_MAX_ITEMS, BulkItemResult
+from src.employees import services as employee_services
+from src.employees.schemas import EmployeeCreate, EmployeeBulkUpdate
+from src.stats import services as stats_services
+from src.tasks import services as task_services
+from src.tasks.schemas import TaskCreate, TaskBulkUpdate, ImportantTask
+
+BULK_RESULTS = TypeAdapter(List[BulkItemResult])
+IMPORTANT_TASKS = TypeAdapter(List[ImportantTask])
+
+# Задача очереди, которую выполняет текущий воркер (выставляет JobWorkerPool._run)
+current_job: ContextVar[Row | None] = ContextVar('current_job', default=None)
+
+
+@dataclass
+class JobHandler:
+    """Функция фоновой задачи и схема ее параметров (payload)"""
+    run: Callable[[Any, AsyncSession], Awaitable[Any]]
+    payload: TypeAdapter
+
+
+def _in_batches(bulk: Callable, idempotent: bool = True) -> Callable:
+    """
+    Массовая операция любого размера пачками по BULK_MAX_ITEMS (каждая - своя транзакция),
+    со сквозной нумерацией элементов в результатах.
+    Неидемпотентную операцию (создание) нельзя повторять целиком: первая закоммиченная пачка
+    снимает оставшиеся попытки задачи, а результаты закоммиченных пачек сохраняются в задаче.
+    """
+    async def run(items: list, session: AsyncSession) -> list:
+        job = current_job.get()
+        results = []
+        for start in range(0, len(items), BULK_MAX_ITEMS):
+            if not idempotent and job is not None:
+                # в транзакции пачки: отметка коммитится только вместе с ее строками
+                await session.execute(
+                    update(Job).where(Job.id == job.id, Job.attempts == job.attempts).values(max_attempts=Job.attempts)
+                )
+            batch = await bulk(items[start:start + BULK_MAX_ITEMS], session)
+            # пачка без записей не коммитит - отметка тогда не нужна
+            await session.rollback()
+            for item in batch:
+                results.append(item.model_copy(update={'index': item.index + start}))
+            if not idempotent and job is not None:
+                await session.execute(
+                    update(Job).where(Job.id == job.id, Job.attempts == job.attempts)
+                    .values(result=BULK_RESULTS.dump_python(results, mode='json'))
+                )
+                await session.commit()
+        return BULK_RESULTS.dump_python(results, mode='json')
+    return run
+
+
+async def _assign_tasks(task_ids: list[int] | None, session: AsyncSession) -> list:
+    assignments = await task_services.assign_tasks(task_ids, session)
+    return [{'task_id': task_id, 'employee_id': employee_id} for task_id, employee_id in assignments]
+
+
+async def _important_tasks(_, session: AsyncSession) -> list:
+    # Результат заодно попадает в кэш ответов /task/important
+    tasks = IMPORTANT_TASKS.validate_python(await task_services.get_important_tasks(session), from_attributes=True)
+    return IMPORTANT_TASKS.dump_python(tasks, mode='json')
+
+
+async def _refresh_stats(_, session: AsyncSession) -> dict:
+    return {'refreshed': await stats_services.refresh_stats(session)}
+
+
+JOB_HANDLERS: dict[str, JobHandler] = {
+    'task.bulk_create': JobHandler(_in_batches(task_services.bulk_create_tasks, idempotent=False),
+                                   TypeAdapter(Annotated[List[TaskCreate], Field(min_length=1)])),
+    'task.bulk_update': JobHandler(_in_batches(task_services.bulk_update_tasks),
+                                   TypeAdapter(Annotated[List[TaskBulkUpdate], Field(min_length=1)])),
+    'task.bulk_delete': JobHandler(_in_batches(task_services.bulk_delete_tasks),
+                                   TypeAdapter(Annotated[List[int], Field(min_length=1)])),
+    'task.assign': JobHandler(_assign_tasks, TypeAdapter(List[int] | None)),
+    'task.important': JobHandler(_important_tasks, TypeAdapter(None)),
+    'employee.bulk_create': JobHandler(_in_batches(employee_services.bulk_create_employees, idempotent=False),
+                                       TypeAdapter(Annotated[List[EmployeeCreate], Field(min_length=1)])),
+    'employee.bulk_update': JobHandler(_in_batches(employee_services.bulk_update_employees),
+                                       TypeAdapter(Annotated[List[EmployeeBulkUpdate], Field(min_length=1)])),
+    'employee.bulk_delete': JobHandler(_in_batches(employee_services.bulk_delete_employees),
+                                       TypeAdapter(Annotated[List[int], Field(min_length=1)])),
+    'stats.refresh': JobHandler(_refresh_stats, TypeAdapter(None)),
+}
@@ -0,0 +1,69 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import get_async_session
+from src.instrumentation import InstrumentedRoute
+from src.jobs.handlers import JOB_HANDLERS
+from src.jobs.schemas import JobCreate, JobRead, JobSummary
+from src.jobs import services
+from src.serialization import json_response
+
+JOB_LIST = TypeAdapter(List[JobSummary])
+
+router = APIRouter(
+    prefix='/jobs',
+    route_class=InstrumentedRoute,
+    tags=['Jobs']
+)
+
+
+@router.post('', response_model=JobSummary, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(new_job: JobCreate, session: AsyncSession = Depends(get_async_session)):
+    """
+    Постановка тяжелой операции в очередь. Ответ приходит сразу,
+    ход выполнения и результат - по GET /jobs/{job_id}.
+    """
+    try:
+        return await services.enqueue_job(new_job.kind, new_job.payload, session, new_job.max_attempts)
+    except LookupError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f'Unknown job kind, expected one of: {", ".join(JOB_HANDLERS)}')
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, 'loc': ('body', 'payload', *error['loc'])} for error in exc.errors(include_url=False)]
+        )
+
+
+@router.get('', response_model=List[JobSummary])
+async def get_jobs(limit: int = Query(default=100, ge=1, le=1000),
+                   after: int | None = Query(default=None, description='id последней задачи предыдущей страницы'),
+                   job_status: str | None = Query(default=None, alias='status'),
+                   kind: str | None = None,
+                   session: AsyncSession = Depends(get_async_session)):
+    """Список задач очереди (постранично, по возрастанию id)"""
+    jobs = await services.get_jobs(session, limit=limit, after=after, status=job_status, kind=kind)
+    return json_response(JOB_LIST, jobs)
+
+
+@router.get('/{job_id}', response_model=JobRead)
+async def get_job(job_id: int, session: AsyncSession = Depends(get_async_session)):
+    """Состояние задачи очереди и ее результат"""
+    job = await services.get_job(job_id, session)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Job not found')
+    return job
+
+
+@router.post('/{job_id}/cancel', response_model=JobSummary)
+async def cancel_job(job_id: int, session: AsyncSession = Depends(get_async_session)):
+    """Отмена задачи, которая еще не начала выполняться"""
+    job = await services.cancel_job(job_id, session)
+    if job is None:
+        if await services.get_job(job_id, session) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Job not found')
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Job is already running or finished')
+    return job
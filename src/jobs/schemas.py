@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class JobCreate(BaseModel):
+    kind: str = Field(description='Тип задачи, например task.bulk_create или task.assign')
+    payload: Any = None
+    max_attempts: int | None = Field(default=None, ge=1, le=20)
+
+
+class JobSummary(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class JobRead(JobSummary):
+    payload: Any = None
+    result: Any = None
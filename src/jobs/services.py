@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import select, insert, update, case, func
+from sqlalchemy.engine import Result, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models.job import Job
+from src.config import settings
+from src.database import async_session_maker
+from src.jobs.handlers import JOB_HANDLERS, current_job
+from src.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+jobs_processed = Counter('jobs_processed_total', 'Background job attempts by outcome', labels=('kind', 'status'))
+job_duration = Histogram('job_duration_seconds', 'Background job attempt duration', labels=('kind',))
+
+PENDING_STATUSES = ('queued', 'running')
+
+
+def _lease():
+    return func.now() + timedelta(seconds=settings.jobs_lease_seconds)
+
+
+def retry_delay(attempts: int) -> float:
+    """Экспоненциальная задержка перед повтором после attempts неудачных попыток"""
+    return min(settings.jobs_retry_backoff_seconds * 2 ** (attempts - 1), settings.jobs_retry_backoff_max_seconds)
+
+
+async def enqueue_job(kind: str, payload: Any, session: AsyncSession, max_attempts: int | None = None) -> Job:
+    """
+    Ставит задачу в очередь. Параметры проверяются схемой обработчика сразу,
+    чтобы ошибка вернулась клиенту, а не всплыла в воркере.
+    """
+    handler = JOB_HANDLERS.get(kind)
+    if handler is None:
+        raise LookupError(f'Unknown job kind: {kind}')
+    payload = handler.payload.dump_python(handler.payload.validate_python(payload), mode='json')
+    stmt = insert(Job).values(
+        kind=kind, payload=payload, max_attempts=max_attempts or settings.jobs_max_attempts
+    ).returning(Job)
+    job = await session.scalar(stmt)
+    await session.commit()
+    worker_pool.wakeup()
+    return job
+
+
+async def get_job(job_id: int, session: AsyncSession) -> Job | None:
+    """Получает задачу очереди по ее id"""
+    return await session.get(Job, job_id)
+
+
+async def get_jobs(session: AsyncSession, limit: int = 100, after: int | None = None,
+                   status: str | None = None, kind: str | None = None) -> list[Row]:
+    """Страница задач очереди (keyset-пагинация по id) без результатов"""
+    stmt = select(
+        Job.id, Job.kind, Job.status, Job.attempts, Job.max_attempts, Job.run_at, Job.error,
+        Job.created_at, Job.started_at, Job.finished_at
+    )
+    if after is not None:
+        stmt = stmt.where(Job.id > after)
+    if status is not None:
+        stmt = stmt.where(Job.status == status)
+    if kind is not None:
+        stmt = stmt.where(Job.kind == kind)
+    result: Result = await session.execute(stmt.order_by(Job.id).limit(limit))
+    return list(result.all())
+
+
+async def cancel_job(job_id: int, session: AsyncSession) -> Job | None:
+    """Отменяет задачу, которая еще ждет в очереди; None, если ее уже взяли или она завершена"""
+    stmt = (
+        update(Job)
+        .where(Job.id == job_id, Job.status == 'queued')
+        .values(status='cancelled', finished_at=func.now())
+        .returning(Job)
+    )
+    job = await session.scalar(stmt)
+    await session.commit()
+    return job
+
+
+async def claim_job(session: AsyncSession) -> Row | None:
+    """
+    Берет одну готовую к запуску задачу: из очереди или брошенную упавшим воркером (истекла аренда).
+    FOR UPDATE SKIP LOCKED позволяет воркерам всех экземпляров разбирать очередь, не мешая друг другу.
+    """
+    ready = (
+        select(Job.id)
+        .where(Job.status.in_(PENDING_STATUSES), Job.run_at <= func.now(), Job.attempts < Job.max_attempts)
+        .order_by(Job.run_at, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Job)
+        .where(Job.id == ready)
+        .values(status='running', attempts=Job.attempts + 1, run_at=_lease(), started_at=func.now())
+        .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+    )
+    result: Result = await session.execute(stmt)
+    job = result.one_or_none()
+    await session.commit()
+    return job
+
+
+async def fail_abandoned_jobs(session: AsyncSession) -> int:
+    """Завершает с ошибкой задачи, брошенные воркером на последней попытке"""
+    stmt = (
+        update(Job)
+        .where(Job.status == 'running', Job.run_at <= func.now(), Job.attempts >= Job.max_attempts)
+        .values(status='failed', finished_at=func.now(), error='Worker lease expired')
+    )
+    result: Result = await session.execute(stmt)
+    await session.commit()
+    return result.rowcount
+
+
+def _owned(job: Row):
+    """Условие, что задача все еще за этим воркером: после истечения аренды ее мог взять другой"""
+    return Job.id == job.id, Job.status == 'running', Job.attempts == job.attempts
+
+
+async def extend_lease(job: Row, session: AsyncSession) -> None:
+    await session.execute(update(Job).where(*_owned(job)).values(run_at=_lease()))
+    await session.commit()
+
+
+async def complete_job(job: Row, result: Any, session: AsyncSession) -> None:
+    stmt = update(Job).where(*_owned(job)).values(status='succeeded', result=result, finished_at=func.now())
+    await session.execute(stmt)
+    await session.commit()
+
+
+async def fail_job(job: Row, error: str, session: AsyncSession) -> str:
+    """
+    Ставит задачу на повтор с задержкой или, если попытки кончились, завершает с ошибкой.
+    Попытки сверяются по строке в базе: обработчик мог снять оставшиеся (см. handlers._in_batches)
+    """
+    retry = Job.attempts < Job.max_attempts
+    stmt = (
+        update(Job)
+        .where(*_owned(job))
+        .values(
+            error=error,
+            status=case((retry, 'queued'), else_='failed'),
+            run_at=case((retry, func.now() + timedelta(seconds=retry_delay(job.attempts))), else_=Job.run_at),
+            finished_at=case((retry, None), else_=func.now()),
+        )
+        .returning(Job.status)
+    )
+    status = await session.scalar(stmt)
+    await session.commit()
+    return status or 'failed'
+
+
+class JobWorkerPool:
+    """
+    Воркеры фоновых задач внутри процесса приложения. Каждый берет задачи из общей
+    таблицы jobs, поэтому работу делят все запущенные экземпляры.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def wakeup(self) -> None:
+        """Будит воркеры этого процесса, не дожидаясь следующего опроса очереди"""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        self._stopping = False
+        self.tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        logger.info('Started %s job workers', self.workers)
+
+    async def stop(self) -> None:
+        """Дает воркерам доделать текущие задачи; недоделанные после таймаута вернутся в очередь по аренде"""
+        self._stopping = True
+        self._wakeup.set()
+        if not self.tasks:
+            return
+        _, pending = await asyncio.wait(self.tasks, timeout=settings.jobs_shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        with suppress(asyncio.CancelledError):
+            await asyncio.gather(*pending)
+        self.tasks = []
+
+    async def _work(self) -> None:
+        while not self._stopping:
+            try:
+                async with async_session_maker() as session:
+                    job = await claim_job(session)
+                    if job is None:
+                        await fail_abandoned_jobs(session)
+            except Exception:
+                logger.exception('Failed to claim a job')
+                job = None
+            if job is None:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.jobs_poll_interval)
+                if not self._stopping:
+                    self._wakeup.clear()
+                continue
+            try:
+                await self._run(job)
+            except Exception:
+                # статус не записан: задача вернется в очередь, когда истечет аренда
+                logger.exception('Failed to record the outcome of job %s', job.id)
+
+    async def _heartbeat(self, job: Row) -> None:
+        while True:
+            await asyncio.sleep(settings.jobs_lease_seconds / 3)
+            try:
+                async with async_session_maker() as session:
+                    await extend_lease(job, session)
+            except Exception:
+                logger.exception('Failed to extend lease of job %s', job.id)
+
+    async def _run(self, job: Row) -> None:
+        handler = JOB_HANDLERS.get(job.kind)
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        started = time.perf_counter()
+        token = current_job.set(job)
+        try:
+            if handler is None:
+                raise LookupError(f'Unknown job kind: {job.kind}')
+            async with async_session_maker() as session:
+                result = await handler.run(handler.payload.validate_python(job.payload), session)
+        except Exception as exc:
+            logger.exception('Job %s (%s) failed on attempt %s', job.id, job.kind, job.attempts)
+            async with async_session_maker() as session:
+                status = await fail_job(job, f'{type(exc).__name__}: {exc}', session)
+        else:
+            async with async_session_maker() as session:
+                await complete_job(job, result, session)
+            status = 'succeeded'
+        finally:
+            current_job.reset(token)
+            heartbeat.cancel()
+        jobs_processed.inc(kind=job.kind, status=status)
+        job_duration.observe(time.perf_counter() - started, kind=job.kind)
+
+
+worker_pool = JobWorkerPool(settings.jobs_workers)
@@ -1,11 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from src.changes.router import router as changes_router
+from src.changes.services import listener
+from src.config import settings
+from src.database import engine, read_engine, read_your_writes_middleware
 from src.employees.router import router as employee_router
+from src.health import router as health_router
+from src.instrumentation import instrumentation_middleware
+from src.jobs.router import router as jobs_router
+from src.jobs.services import worker_pool
+from src.metrics import router as metrics_router
+from src.stats.router import router as stats_router
 from src.tasks.router import router as task_router
+from src.warmup import warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Запуск и остановка процесса: прогрев пула, фоновые воркеры, закрытие соединений"""
+    app.state.warm = not settings.warmup_enabled
+    warmup = asyncio.create_task(warm_up(app.state)) if settings.warmup_enabled else None
+    if settings.change_feed_backend == 'postgres':
+        await listener.start()
+    if settings.jobs_workers:
+        await worker_pool.start()
+
+    yield
+
+    app.state.warm = False
+    if warmup is not None:
+        warmup.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup
+    if settings.jobs_workers:
+        await worker_pool.stop()
+    if settings.change_feed_backend == 'postgres':
+        await listener.stop()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 
 app = FastAPI(
-    title='Task Tracker'
+    title='Task Tracker',
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+if settings.db_replica_url:
+    app.middleware('http')(read_your_writes_middleware)
+
+if settings.instrumentation_enabled:
+    app.middleware('http')(instrumentation_middleware)
+
 app.include_router(employee_router)
 app.include_router(task_router)
+app.include_router(stats_router)
+app.include_router(jobs_router)
+app.include_router(changes_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
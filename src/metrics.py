@@ -0,0 +1,110 @@
+from typing import Callable, Iterable
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_registry: list['Metric'] = []
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        lines.extend(f'{name} {value}' for name, value in self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: dict[tuple[str, ...], float] = {} if labels else {(): 0.0}
+
+    @property
+    def value(self) -> float:
+        return sum(self.values.values())
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield f'{self.name}{_format_labels(self.label_names, key)}', value
+
+
+class Gauge(Metric):
+    """Значение читается функцией в момент отдачи метрик"""
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.function = function
+
+    def samples(self):
+        yield self.name, self.function()
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+        # значения по набору меток: (счетчики по корзинам, количество, сумма)
+        self.series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        series = self.series.setdefault(self._key(labels), [[0] * len(self.buckets), 0, 0.0])
+        series[1] += 1
+        series[2] += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][index] += 1
+
+    def samples(self):
+        for key, (counts, count, total) in self.series.items():
+            labels = _format_labels(self.label_names, key)
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield self.name + '_bucket' + _format_labels(self.label_names, key, f'le="{bound}"'), bucket_count
+            yield self.name + '_bucket' + _format_labels(self.label_names, key, 'le="+Inf"'), count
+            yield f'{self.name}_sum{labels}', total
+            yield f'{self.name}_count{labels}', count
+
+
+def render_metrics() -> str:
+    """Все метрики в текстовом формате Prometheus"""
+    return '\n'.join(metric.render() for metric in _registry) + '\n'
+
+
+router = APIRouter(tags=['Metrics'])
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def get_metrics():
+    """Метрики сервиса в формате Prometheus"""
+    return render_metrics()
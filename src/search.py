@@ -0,0 +1,21 @@
+from sqlalchemy import String, func, literal, or_, text
+from sqlalchemy.dialects.postgresql import to_tsvector, websearch_to_tsquery
+from sqlalchemy.sql import ColumnElement
+
+# Конфигурация без морфологии: названия и имена бывают на разных языках.
+# Литерал, а не параметр: выражение должно совпасть с выражением GIN-индекса
+SEARCH_CONFIG = text("'simple'")
+
+
+def text_search(document: ColumnElement, query: str) -> tuple[ColumnElement, ColumnElement]:
+    """
+    Условие и ранг поиска по тексту: совпадение слов (tsvector) или нечеткое совпадение
+    фрагмента с частью текста (pg_trgm, word_similarity). Оба условия идут по GIN-индексам.
+    """
+    tsvector = to_tsvector(SEARCH_CONFIG, document)
+    tsquery = websearch_to_tsquery(SEARCH_CONFIG, query)
+    fragment = literal(query, String)
+    # precedence: составной документ (a || b) попадает в скобки, иначе <% применится к первой части
+    condition = or_(tsvector.bool_op('@@')(tsquery), fragment.bool_op('<%', precedence=100)(document))
+    rank = func.ts_rank(tsvector, tsquery) + func.word_similarity(fragment, document)
+    return condition, rank
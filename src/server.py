@@ -0,0 +1,64 @@
+"""
+Запуск в продакшене: несколько процессов uvicorn (uvloop, httptools), каждый со своим пулом соединений.
+
+    python -m src.server
+"""
+import logging
+import os
+
+import uvicorn
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _local_backends() -> list[str]:
+    """
+    Кэш и лента изменений в памяти живут внутри одного процесса: с несколькими процессами
+    остальные отдавали бы устаревшие данные до CACHE_TTL, а подписчики теряли бы события
+    """
+    return [name for name, backend in (('CACHE_BACKEND', settings.cache_backend),
+                                       ('CHANGE_FEED_BACKEND', settings.change_feed_backend))
+            if backend == 'memory']
+
+
+def resolve_workers() -> int:
+    """
+    Число процессов: WEB_WORKERS или по числу ядер. С бэкендами в памяти по умолчанию
+    запускается один процесс, а явно заданные несколько процессов - ошибка конфигурации
+    """
+    local = _local_backends()
+    workers = settings.web_workers
+    if workers:
+        if workers > 1 and local:
+            raise SystemExit(f'{workers} workers need shared backends, but {" and ".join(local)} = memory: '
+                             'set CACHE_BACKEND=redis (or none) and CHANGE_FEED_BACKEND=postgres, or WEB_WORKERS=1')
+        return workers
+    workers = os.cpu_count() or 1
+    if workers > 1 and local:
+        logger.warning('%s = memory: starting 1 worker instead of %d, set CACHE_BACKEND=redis (or none) '
+                       'and CHANGE_FEED_BACKEND=postgres to use all CPU cores', ' and '.join(local), workers)
+        return 1
+    return workers
+
+
+def main() -> None:
+    workers = resolve_workers()
+    uvicorn.run(
+        'src.main:app',
+        host=settings.web_host,
+        port=settings.web_port,
+        workers=workers,
+        loop='auto',  # uvloop, если установлен
+        http='auto',  # httptools, если установлен
+        lifespan='on',
+        proxy_headers=True,
+        forwarded_allow_ips=settings.web_forwarded_allow_ips,
+        timeout_graceful_shutdown=settings.web_graceful_shutdown,
+        access_log=settings.web_access_log,
+    )
+
+
+if __name__ == '__main__':
+    main()
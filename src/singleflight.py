@@ -0,0 +1,114 @@
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable
+
+import orjson
+
+from src.config import settings
+from src.database import REPLICA_SESSION
+from src.metrics import Counter
+
+flight_calls = Counter('singleflight_calls_total', 'Coalesced service calls that ran the query', labels=('function',))
+flight_shared = Counter('singleflight_shared_total', 'Calls answered by an identical in-flight call (queries saved)',
+                        labels=('function',))
+flight_timeouts = Counter('singleflight_timeouts_total', 'Calls that stopped waiting for an in-flight call',
+                          labels=('function',))
+
+
+class _LeaderCancelled(Exception):
+    """Вызов, который ждали, отменен (например, клиент отключился): ожидающие выполняют запрос сами"""
+
+
+def call_key(func: Callable, signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+    """
+    Ключ вызова сервисной функции: ее имя, аргументы, кроме сессии, и источник чтения.
+    Реплика сразу после записи может отставать: ее результат не должен достаться
+    клиенту, чтение которого направлено в основную базу (read-your-writes).
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = {name: value for name, value in bound.arguments.items() if name != 'session'}
+    session = bound.arguments.get('session')
+    source = 'replica' if session is not None and session.info.get(REPLICA_SESSION) else 'primary'
+    return f'{func.__module__}.{func.__qualname__}:{orjson.dumps(arguments, default=str).decode()}:{source}'
+
+
+class SingleFlight:
+    """Одновременные вызовы с одинаковым ключом ждут первый из них и получают его результат"""
+
+    def __init__(self):
+        self._flights: dict[str, asyncio.Future] = {}
+        self._generations: dict[str, int] = {}
+
+    def generation(self, tags: tuple[str, ...]) -> tuple[int, ...]:
+        return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def forget(self, tags: tuple[str, ...]) -> None:
+        """После записи новые вызовы не присоединяются к запросам, начатым до нее"""
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]], timeout: float, name: str) -> Any:
+        flight = self._flights.get(key)
+        if flight is not None:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(flight), timeout)
+            except asyncio.TimeoutError:
+                flight_timeouts.inc(function=name)
+            except _LeaderCancelled:
+                pass
+            else:
+                flight_shared.inc(function=name)
+                return result
+            flight_calls.inc(function=name)
+            return await call()
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        flight_calls.inc(function=name)
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self._fail(flight, _LeaderCancelled())
+            raise
+        except Exception as exc:
+            self._fail(flight, exc)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+
+    @staticmethod
+    def _fail(flight: asyncio.Future, exc: Exception) -> None:
+        flight.set_exception(exc)
+        # если ожидающих нет, asyncio иначе пишет в лог о неполученном исключении
+        flight.exception()
+
+
+flights = SingleFlight()
+
+
+def single_flight(*tags: str, timeout: float | None = None):
+    """
+    Объединяет одновременные одинаковые вызовы сервисной функции в один запрос к базе.
+    Ожидающий вызов ждет не дольше timeout, затем выполняет запрос сам.
+    Теги - те же, что сбрасывает invalidate: после записи в этом процессе
+    новые вызовы не получат результат запроса, начатого до нее.
+    """
+
+    def decorator(func: Callable):
+        signature = inspect.signature(func)
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            key = f'{call_key(func, signature, args, kwargs)}:{flights.generation(tags)}'
+            return await flights.do(key, lambda: func(*args, **kwargs),
+                                    settings.singleflight_timeout if timeout is None else timeout, name)
+
+        return wrapper
+
+    return decorator
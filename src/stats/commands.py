@@ -0,0 +1,29 @@
+"""
+Пересчет статистики нагрузки (например, из cron).
+
+    python -m src.stats.commands refresh
+"""
+import argparse
+import asyncio
+import sys
+
+from src.database import async_session_maker
+from src.stats.services import refresh_stats
+
+
+async def refresh() -> int:
+    async with async_session_maker() as session:
+        refreshed = await refresh_stats(session)
+    print('Stats refreshed' if refreshed else 'Stats refresh is already running')
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Workload stats maintenance')
+    parser.add_argument('command', choices=['refresh'])
+    parser.parse_args()
+    sys.exit(asyncio.run(refresh()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Query
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import get_async_session, get_read_session
+from src.instrumentation import InstrumentedRoute
+from src.serialization import json_response
+from src.stats.schemas import EmployeeStatsPage, Stats
+from src.stats import services
+
+STATS = TypeAdapter(Stats)
+EMPLOYEE_STATS_PAGE = TypeAdapter(EmployeeStatsPage)
+
+router = APIRouter(
+    prefix='/stats',
+    route_class=InstrumentedRoute,
+    tags=['Stats']
+)
+
+
+@router.get('', response_model=Stats)
+async def get_stats(session: AsyncSession = Depends(get_read_session)):
+    """
+    Нагрузка по должностям: активные, завершенные и просроченные задачи, средняя глубина задач.
+    Данные из материализованного представления на момент refreshed_at; устаревшие пересчитываются в фоне.
+    """
+    stats = await services.get_stats(session)
+    return json_response(STATS, stats)
+
+
+@router.get('/employees', response_model=EmployeeStatsPage)
+async def get_employee_stats(limit: int = Query(default=100, ge=1, le=1000),
+                             after: int | None = Query(default=None, description='id последнего сотрудника страницы'),
+                             position: str | None = None,
+                             session: AsyncSession = Depends(get_read_session)):
+    """Нагрузка по сотрудникам (постранично, по возрастанию id)"""
+    stats = await services.get_employee_stats(session, limit=limit, after=after, position=position)
+    return json_response(EMPLOYEE_STATS_PAGE, stats)
+
+
+@router.post('/refresh')
+async def refresh_stats(session: AsyncSession = Depends(get_async_session)):
+    """Немедленный пересчет статистики"""
+    return {'refreshed': await services.refresh_stats(session)}
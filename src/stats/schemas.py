@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+
+class TaskCounts(BaseModel):
+    active_tasks: int
+    finished_tasks: int
+    overdue_tasks: int
+
+
+class WorkloadStats(TaskCounts):
+    avg_task_depth: float | None
+
+
+class PositionStats(WorkloadStats):
+    position: str
+    employees: int
+
+
+class TotalStats(WorkloadStats):
+    employees: int
+
+
+class EmployeeStats(WorkloadStats):
+    employee_id: int
+    first_name: str
+    second_name: str
+    position: str
+
+
+class Stats(BaseModel):
+    refreshed_at: datetime | None
+    total: TotalStats
+    positions: List[PositionStats]
+
+
+class EmployeeStatsPage(BaseModel):
+    refreshed_at: datetime | None
+    employees: List[EmployeeStats]
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import Integer, Numeric, String, cast, column, func, select, table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models.stats_refresh import StatsRefresh
+from src.config import settings
+from src.database import async_session_maker
+from src.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+stats_refresh_seconds = Histogram('stats_refresh_seconds', 'Time spent refreshing workload stats views')
+
+# Ключ advisory-блокировки: обновление идет не больше чем в одном процессе одновременно
+STATS_REFRESH_LOCK = 0x57A7
+
+STATS_VIEW = 'employee_stats'
+
+
+def _counters() -> tuple:
+    return (
+        column('active_tasks', Integer), column('finished_tasks', Integer), column('overdue_tasks', Integer),
+        column('depth_sum', Integer), column('depth_count', Integer),
+    )
+
+
+# Материализованные представления из миграции e4c7a2b9d815: в метаданных моделей их нет
+employee_stats = table('employee_stats', column('employee_id', Integer), column('first_name', String),
+                       column('second_name', String), column('position', String), *_counters())
+position_stats = table('position_stats', column('position', String), column('employees', Integer), *_counters())
+
+_refresh: asyncio.Task | None = None
+
+
+def _stats_columns(stats) -> tuple:
+    """Счетчики задач и средняя глубина задачи в дереве (0 - корневая задача)"""
+    return (
+        stats.c.active_tasks, stats.c.finished_tasks, stats.c.overdue_tasks,
+        func.round(cast(stats.c.depth_sum, Numeric) / func.nullif(stats.c.depth_count, 0), 2).label('avg_task_depth'),
+    )
+
+
+async def _refreshed_at(session: AsyncSession) -> datetime | None:
+    """Время последнего обновления статистики; запускает фоновое обновление, если она устарела"""
+    refreshed_at = await session.scalar(select(StatsRefresh.refreshed_at).where(StatsRefresh.view == STATS_VIEW))
+    age = None if refreshed_at is None else (datetime.now(timezone.utc) - refreshed_at).total_seconds()
+    if age is None or age > settings.stats_max_age_seconds:
+        schedule_refresh()
+    return refreshed_at
+
+
+async def get_stats(session: AsyncSession) -> dict:
+    """Статистика по должностям и итог по всем сотрудникам из материализованного представления"""
+    stmt = select(position_stats.c.position, position_stats.c.employees, *_stats_columns(position_stats),
+                  position_stats.c.depth_sum, position_stats.c.depth_count)
+    result: Result = await session.execute(stmt.order_by(position_stats.c.position))
+    positions = result.all()
+    depth_sum = sum(row.depth_sum for row in positions)
+    depth_count = sum(row.depth_count for row in positions)
+    total = {
+        'employees': sum(row.employees for row in positions),
+        'active_tasks': sum(row.active_tasks for row in positions),
+        'finished_tasks': sum(row.finished_tasks for row in positions),
+        'overdue_tasks': sum(row.overdue_tasks for row in positions),
+        # среднее по всем задачам, а не среднее средних по должностям
+        'avg_task_depth': round(depth_sum / depth_count, 2) if depth_count else None,
+    }
+    return {'refreshed_at': await _refreshed_at(session), 'total': total, 'positions': positions}
+
+
+async def get_employee_stats(session: AsyncSession, limit: int = 100, after: int | None = None,
+                             position: str | None = None) -> dict:
+    """Страница статистики по сотрудникам (keyset-пагинация по id сотрудника)"""
+    stmt = select(
+        employee_stats.c.employee_id, employee_stats.c.first_name, employee_stats.c.second_name,
+        employee_stats.c.position, *_stats_columns(employee_stats)
+    )
+    if after is not None:
+        stmt = stmt.where(employee_stats.c.employee_id > after)
+    if position is not None:
+        stmt = stmt.where(employee_stats.c.position == position)
+    stmt = stmt.order_by(employee_stats.c.employee_id).limit(limit)
+    result: Result = await session.execute(stmt)
+    return {'refreshed_at': await _refreshed_at(session), 'employees': result.all()}
+
+
+async def refresh_stats(session: AsyncSession) -> bool:
+    """
+    Пересчитывает представления со статистикой, не блокируя чтение (REFRESH ... CONCURRENTLY).
+    Возвращает False, если обновление уже идет в другом процессе.
+    """
+    if not await session.scalar(select(func.pg_try_advisory_xact_lock(STATS_REFRESH_LOCK))):
+        await session.rollback()
+        return False
+    started = time.perf_counter()
+    await session.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY employee_stats'))
+    await session.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY position_stats'))
+    stmt = insert(StatsRefresh).values(view=STATS_VIEW)
+    await session.execute(stmt.on_conflict_do_update(index_elements=[StatsRefresh.view],
+                                                     set_={'refreshed_at': func.now()}))
+    await session.commit()
+    stats_refresh_seconds.observe(time.perf_counter() - started)
+    return True
+
+
+async def _refresh_in_background() -> None:
+    try:
+        async with async_session_maker() as session:
+            await refresh_stats(session)
+    except Exception:
+        logger.exception('Workload stats refresh failed')
+
+
+def schedule_refresh() -> None:
+    """Запускает обновление статистики в фоне, если оно еще не идет в этом процессе"""
+    global _refresh
+    if _refresh is None or _refresh.done():
+        _refresh = asyncio.create_task(_refresh_in_background())
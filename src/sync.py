@@ -0,0 +1,89 @@
+import base64
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, Table, Text, cast, func, insert, literal, select, tuple_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models.tombstone import Tombstone
+
+
+class SyncToken(BaseModel):
+    """
+    Позиция клиента: (транзакция, id) последней полученной строки и последней полученной
+    записи об удалении. Токены прежнего формата (по updated_at) читаются как пустые - полная синхронизация
+    """
+    xid: int = 0
+    id: int = 0
+    tombstone_xid: int = 0
+    tombstone_id: int = 0
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(orjson.dumps(self.model_dump(mode='json'))).decode()
+
+    @classmethod
+    def decode(cls, token: str | None) -> 'SyncToken':
+        if not token:
+            return cls()
+        return cls.model_validate(orjson.loads(base64.urlsafe_b64decode(token.encode())))
+
+
+def _completed_xid_horizon():
+    """
+    Номер, меньше которого нет незавершенных транзакций (xmin текущего снимка).
+    Строка с меньшим change_xid уже не появится позади позиции клиента, как бы долго
+    ни шла записавшая ее транзакция - в отличие от updated_at, который равен началу транзакции
+    """
+    return cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+
+async def record_tombstones(entity: str, ids: list[int], session: AsyncSession) -> None:
+    """Сохраняет записи об удалении строк (без коммита)"""
+    if not ids:
+        return
+    tombstones = Tombstone.__table__
+    stmt = insert(tombstones).from_select(
+        ['entity', 'entity_id'],
+        select(literal(entity), func.unnest(bindparam('deleted_ids', list(ids), type_=ARRAY(Integer))))
+    )
+    await session.execute(stmt)
+
+
+async def get_changes(table: Table, entity: str, token: SyncToken, limit: int,
+                      session: AsyncSession) -> tuple[list, list[int], SyncToken, bool]:
+    """
+    Страница изменений после позиции token: измененные строки (по change_xid, id)
+    и id удаленных строк. Отдаются только изменения завершенных транзакций,
+    поэтому позиция клиента не обгоняет еще не закоммиченные строки.
+    """
+    stmt = (
+        select(table)
+        .where(table.c.change_xid < _completed_xid_horizon(),
+               tuple_(table.c.change_xid, table.c.id) > tuple_(literal(token.xid, BigInteger), token.id))
+        .order_by(table.c.change_xid, table.c.id)
+        .limit(limit)
+    )
+    result: Result = await session.execute(stmt)
+    rows = result.all()
+
+    tombstones = Tombstone.__table__
+    stmt = (
+        select(tombstones.c.id, tombstones.c.entity_id, tombstones.c.change_xid)
+        .where(tombstones.c.entity == entity, tombstones.c.change_xid < _completed_xid_horizon(),
+               tuple_(tombstones.c.change_xid, tombstones.c.id)
+               > tuple_(literal(token.tombstone_xid, BigInteger), token.tombstone_id))
+        .order_by(tombstones.c.change_xid, tombstones.c.id)
+        .limit(limit)
+    )
+    result = await session.execute(stmt)
+    deleted = result.all()
+
+    next_token = token.model_copy()
+    if rows:
+        next_token.xid, next_token.id = rows[-1].change_xid, rows[-1].id
+    if deleted:
+        next_token.tombstone_xid, next_token.tombstone_id = deleted[-1].change_xid, deleted[-1].id
+    has_more = len(rows) == limit or len(deleted) == limit
+    return rows, [tombstone.entity_id for tombstone in deleted], next_token, has_more
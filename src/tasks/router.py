@@ -1,29 +1,162 @@
+from datetime import date
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_session
-from core.models.employee import Employee
-from src.tasks.schemas import TaskRead, TaskCreate, TaskUpdate
+from src.bulk import BulkItems, BulkItemResult
+from src.database import get_async_session, get_read_session
+from src.etag import VersionConflict, etag, if_match_versions, not_modified
+from src.export import ExportFormat, MEDIA_TYPES
+from src.instrumentation import InstrumentedRoute
+from src.serialization import json_response
+from src.tasks.schemas import (TaskRead, TaskCreate, TaskUpdate, TaskBulkUpdate, ImportantTask, TaskTree,
+                               TaskAncestors, TaskAssignment, TaskChanges, DeadlineSummary, TaskSearchResult)
 from src.tasks import services
-from src.tasks.dependencies import get_least_busy_employee
+
+TASK_LIST = TypeAdapter(List[TaskRead])
+TASK_SEARCH_RESULTS = TypeAdapter(List[TaskSearchResult])
+IMPORTANT_TASK_LIST = TypeAdapter(List[ImportantTask])
+TASK_ASSIGNMENT_LIST = TypeAdapter(List[TaskAssignment])
+TASK_CHANGES = TypeAdapter(TaskChanges)
+DEADLINE_SUMMARY = TypeAdapter(DeadlineSummary)
 
 router = APIRouter(
     prefix='/task',
+    route_class=InstrumentedRoute,
     tags=['Tasks']
 )
 
 
 @router.get('/list', response_model=List[TaskRead])
-async def get_all_tasks(session: AsyncSession = Depends(get_async_session)):
-    """Общий список задач"""
-    return await services.get_all_tasks(session)
+async def get_all_tasks(limit: int = Query(default=100, ge=1, le=1000),
+                        after: int | None = Query(default=None, description='id последней задачи предыдущей страницы'),
+                        is_active: bool | None = None,
+                        employee_id: int | None = None,
+                        deadline_from: date | None = None,
+                        deadline_to: date | None = None,
+                        session: AsyncSession = Depends(get_read_session)):
+    """Общий список задач (постранично, по возрастанию id)"""
+    tasks = await services.get_all_tasks(session, limit=limit, after=after, is_active=is_active,
+                                         employee_id=employee_id, deadline_from=deadline_from,
+                                         deadline_to=deadline_to)
+    return json_response(TASK_LIST, tasks)
+
+
+@router.get('/search', response_model=List[TaskSearchResult])
+async def search_tasks(q: str = Query(min_length=1, max_length=200, description='Слова или фрагмент названия'),
+                       limit: int = Query(default=20, ge=1, le=100),
+                       offset: int = Query(default=0, ge=0, le=1000),
+                       is_active: bool | None = None,
+                       session: AsyncSession = Depends(get_read_session)):
+    """Поиск задач по названию (по словам и нечеткий, с опечатками), по убыванию релевантности"""
+    tasks = await services.search_tasks(q, session, limit=limit, offset=offset, is_active=is_active)
+    return json_response(TASK_SEARCH_RESULTS, tasks)
+
+
+@router.get('/export')
+async def export_tasks(export_format: ExportFormat = Query(default=ExportFormat.ndjson, alias='format'),
+                       session: AsyncSession = Depends(get_read_session)):
+    """Потоковая выгрузка всех задач в NDJSON или CSV"""
+    return StreamingResponse(
+        services.export_tasks(session, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="tasks.{export_format.value}"'}
+    )
+
+
+@router.get('/changes', response_model=TaskChanges)
+async def get_task_changes(since: str | None = Query(default=None, description='next_token из предыдущего ответа'),
+                           limit: int = Query(default=500, ge=1, le=5000),
+                           session: AsyncSession = Depends(get_read_session)):
+    """
+    Изменения задач с момента since: измененные строки и id удаленных.
+    Без since - полная выгрузка по страницам. Пока has_more, запрашивать дальше с next_token.
+    """
+    try:
+        changes = await services.get_task_changes(since, limit, session)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid sync token')
+    return json_response(TASK_CHANGES, changes)
+
+
+@router.get('/overdue', response_model=List[TaskRead])
+async def get_overdue_tasks(limit: int = Query(default=100, ge=1, le=1000),
+                            after_deadline: date | None = Query(default=None, description='срок последней задачи'),
+                            after: int | None = Query(default=None, description='id последней задачи'),
+                            employee_id: int | None = None,
+                            session: AsyncSession = Depends(get_read_session)):
+    """Активные задачи с прошедшим сроком (постранично, по возрастанию срока)"""
+    tasks = await services.get_overdue_tasks(session, limit=limit, after_deadline=after_deadline, after=after,
+                                             employee_id=employee_id)
+    return json_response(TASK_LIST, tasks)
+
+
+@router.get('/due-soon', response_model=List[TaskRead])
+async def get_due_soon_tasks(days: int = Query(default=7, ge=0, le=365),
+                             limit: int = Query(default=100, ge=1, le=1000),
+                             after_deadline: date | None = Query(default=None, description='срок последней задачи'),
+                             after: int | None = Query(default=None, description='id последней задачи'),
+                             employee_id: int | None = None,
+                             session: AsyncSession = Depends(get_read_session)):
+    """Активные задачи со сроком в ближайшие days дней, включая сегодня (по возрастанию срока)"""
+    tasks = await services.get_due_soon_tasks(days, session, limit=limit, after_deadline=after_deadline, after=after,
+                                              employee_id=employee_id)
+    return json_response(TASK_LIST, tasks)
+
+
+@router.get('/deadlines', response_model=DeadlineSummary)
+async def get_deadline_summary(days: int = Query(default=7, ge=0, le=365),
+                               employee_id: int | None = None,
+                               session: AsyncSession = Depends(get_read_session)):
+    """Количество просроченных и скоро истекающих задач по исполнителям и в целом"""
+    summary = await services.get_deadline_summary(days, session, employee_id=employee_id)
+    return json_response(DEADLINE_SUMMARY, summary)
 
 
 @router.get('/detail/{task_id}', response_model=TaskRead)
-async def get_task(task_id: int, session: AsyncSession = Depends(get_async_session)):
-    """Данные по одной задаче"""
-    return await services.get_task(task_id, session)
+async def get_task(task_id: int, response: Response, if_none_match: str | None = Header(default=None),
+                   session: AsyncSession = Depends(get_read_session)):
+    """Данные по одной задаче. С If-None-Match и неизменной задачей - 304 без тела"""
+    task = await services.get_task(task_id, session)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Task not found')
+    tag = etag(task.version)
+    if not_modified(if_none_match, tag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={'ETag': tag})
+    response.headers['ETag'] = tag
+    return task
+
+
+@router.get('/{task_id}/tree', response_model=TaskTree, response_model_exclude_unset=True)
+async def get_task_tree(task_id: int,
+                        max_depth: int = Query(default=100, ge=0, le=100000,
+                                               description=f'Без flat - не больше {services.TREE_MAX_NESTED_DEPTH}'),
+                        flat: bool = Query(default=False, description='Плоский список вместо вложенного дерева'),
+                        session: AsyncSession = Depends(get_read_session)):
+    """
+    Дерево подзадач, зависящих от задачи. Вложенное дерево ограничено по глубине
+    (TREE_MAX_NESTED_DEPTH), глубокие цепочки запрашиваются с flat=true
+    """
+    if not flat and max_depth > services.TREE_MAX_NESTED_DEPTH:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f'max_depth above {services.TREE_MAX_NESTED_DEPTH} requires flat=true')
+    tree = await services.get_task_tree(task_id, max_depth, flat, session)
+    if tree is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Task not found')
+    return tree
+
+
+@router.get('/{task_id}/ancestors', response_model=TaskAncestors)
+async def get_task_ancestors(task_id: int,
+                             max_depth: int = Query(default=1000, ge=0, le=100000),
+                             session: AsyncSession = Depends(get_read_session)):
+    """Цепочка базовых задач, от которых зависит задача"""
+    ancestors = await services.get_task_ancestors(task_id, max_depth, session)
+    if ancestors is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Task not found')
+    return ancestors
 
 
 @router.post('/create', response_model=TaskRead)
@@ -33,40 +166,69 @@ async def create_task(new_task: TaskCreate, session: AsyncSession = Depends(get_
 
 
 @router.patch('/update/{task_id}', response_model=TaskRead)
-async def update_task(task_id: int, task_update: TaskUpdate, session: AsyncSession = Depends(get_async_session)):
-    """Обновление задачи"""
-    return await services.update_task(task_id, task_update, session)
+async def update_task(task_id: int, task_update: TaskUpdate, response: Response,
+                      if_match: str | None = Header(default=None), session: AsyncSession = Depends(get_async_session)):
+    """
+    Обновление задачи. С If-Match (ETag задачи) обновляет, только если задачу
+    не изменили с момента чтения, иначе 412
+    """
+    try:
+        task = await services.update_task(task_id, task_update, session, expected_versions=if_match_versions(if_match))
+    except VersionConflict:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail='Task was modified')
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Task not found')
+    response.headers['ETag'] = etag(task.version)
+    return task
 
 
 @router.delete('/delete/{task_id}')
 async def delete_task(task_id: int, session: AsyncSession = Depends(get_async_session)):
     """Удаление задачи"""
-    return await services.delete_task(task_id, session)
+    result = await services.delete_task(task_id, session)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Task not found')
+    return result
+
+
+@router.post('/bulk/create', response_model=List[BulkItemResult])
+async def bulk_create_tasks(new_tasks: BulkItems[TaskCreate], session: AsyncSession = Depends(get_async_session)):
+    """Пакетное создание задач"""
+    return await services.bulk_create_tasks(new_tasks, session)
 
 
-@router.get('/important')
-async def get_important_tasks(least_busy_employee: Employee = Depends(get_least_busy_employee),
-                              session: AsyncSession = Depends(get_async_session)):
+@router.patch('/bulk/update', response_model=List[BulkItemResult])
+async def bulk_update_tasks(tasks_update: BulkItems[TaskBulkUpdate],
+                            session: AsyncSession = Depends(get_async_session)):
+    """Пакетное обновление задач"""
+    return await services.bulk_update_tasks(tasks_update, session)
+
+
+@router.post('/bulk/delete', response_model=List[BulkItemResult])
+async def bulk_delete_tasks(task_ids: BulkItems[int], session: AsyncSession = Depends(get_async_session)):
+    """Пакетное удаление задач"""
+    return await services.bulk_delete_tasks(task_ids, session)
+
+
+@router.get('/important', response_model=List[ImportantTask])
+async def get_important_tasks(session: AsyncSession = Depends(get_read_session)):
     """
     Список важных задач и возможных сотрудников для их выполнения.
     Важные задачи - задачи, не взятые в работу, и от которых зависят
     другие задачи, взятые в работу.
     """
-    tasks = await services.get_important_tasks(session)
-    res_tasks = []
-    for task in tasks:
-        parent_task_employee_task_count = len([t for t in task.parent_task.employee.tasks if t.is_active])
-        least_busy_employee_task_count = len([t for t in least_busy_employee.tasks if t.is_active])
-        res = parent_task_employee_task_count - least_busy_employee_task_count
-        if res <= 2:
-            available_employee = task.parent_task.employee
-        else:
-            available_employee = least_busy_employee
-
-        task_data = {
-            'task': TaskRead.model_validate(task, from_attributes=True),
-            'available_employee': available_employee.__str__()
-        }
-        res_tasks.append(task_data)
-
-    return res_tasks
+    return json_response(IMPORTANT_TASK_LIST, await services.get_important_tasks(session))
+
+
+@router.post('/assign', response_model=List[TaskAssignment])
+async def assign_tasks(task_ids: List[int] | None = Body(default=None, description='Задачи для распределения. '
+                                                                            'По умолчанию - все неназначенные'),
+                       session: AsyncSession = Depends(get_async_session)):
+    """
+    Распределение активных неназначенных задач между сотрудниками: по нагрузке,
+    начиная с ближайших сроков, с приоритетом исполнителя базовой задачи.
+    """
+    assignments = await services.assign_tasks(task_ids, session)
+    return json_response(TASK_ASSIGNMENT_LIST, [
+        {'task_id': task_id, 'employee_id': employee_id} for task_id, employee_id in assignments
+    ])
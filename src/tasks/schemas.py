@@ -1,11 +1,11 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
-from datetime import date
+from datetime import date, datetime
 
 
 class TaskBase(BaseModel):
-    title: str
+    title: str = Field(max_length=100)
     base_task: Optional[int] = Field(default=None, foreign_key='task.id')
     employee_id: Optional[int] = Field(default=None, foreign_key='employee.id')
     deadline: date
@@ -17,12 +17,75 @@ class TaskCreate(TaskBase):
 
 
 class TaskUpdate(TaskCreate):
-    title: str | None = None
+    title: str | None = Field(default=None, max_length=100)
     base_task: Optional[int] = Field(default=None, foreign_key='task.id')
     employee_id: Optional[int] = Field(default=None, foreign_key='employee.id')
     deadline: date | None = None
     is_active: bool | None = None
 
 
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+
 class TaskRead(TaskBase):
     id: int
+    version: int
+
+
+class TaskSearchResult(TaskRead):
+    rank: float
+
+
+class ImportantTask(BaseModel):
+    task: TaskRead
+    available_employee: str
+
+
+class TaskTreeItem(TaskRead):
+    depth: int
+
+
+class TaskTreeNode(TaskTreeItem):
+    subtasks: List['TaskTreeNode'] = []
+
+
+class TaskTree(BaseModel):
+    has_cycle: bool = False
+    root: TaskTreeNode | None = None
+    nodes: List[TaskTreeItem] | None = None
+
+
+class TaskAncestors(BaseModel):
+    has_cycle: bool = False
+    ancestors: List[TaskTreeItem] = []
+
+
+class TaskAssignment(BaseModel):
+    task_id: int
+    employee_id: int
+
+
+class TaskSyncRead(TaskRead):
+    created_at: datetime
+    updated_at: datetime
+
+
+class TaskChanges(BaseModel):
+    items: List[TaskSyncRead]
+    deleted: List[int]
+    next_token: str
+    has_more: bool
+
+
+class EmployeeDeadlines(BaseModel):
+    employee_id: int | None
+    overdue: int
+    due_soon: int
+
+
+class DeadlineSummary(BaseModel):
+    days: int
+    overdue: int
+    due_soon: int
+    employees: List[EmployeeDeadlines]
@@ -1,19 +1,144 @@
-from sqlalchemy import select
+import heapq
+from collections import Counter
+from datetime import date
+
+from pydantic import TypeAdapter
+from sqlalchemy import (select, insert, update, delete, case, cast, true, func, literal, values, column,
+                        bindparam, tuple_, Integer, String, Boolean, TIMESTAMP)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
-from sqlalchemy.engine import Result
+from sqlalchemy.orm import aliased
+from sqlalchemy.engine import Result, Row
 
 from core.models.task import Task
 from core.models.employee import Employee
-from src.tasks.schemas import TaskCreate, TaskUpdate
+from src.bulk import BulkItemResult, existing_ids, failed, id_array
+from src.cache import TASKS_TAG, EMPLOYEES_TAG, cached, invalidate
+from src.changes.services import record_change
+from src.employees.services import change_active_tasks_count, change_active_tasks_counts
+from src.etag import VersionConflict
+from src.export import ExportFormat, export_rows
+from src.search import text_search
+from src.singleflight import single_flight
+from src.sync import SyncToken, get_changes, record_tombstones
+from src.tasks.schemas import TaskCreate, TaskUpdate, TaskBulkUpdate, TaskRead, ImportantTask
+
+# На сколько задач исполнитель базовой задачи может быть загружен больше самого свободного
+# сотрудника, чтобы зависимая задача все равно досталась ему
+PARENT_ASSIGNEE_LOAD_GAP = 2
+
+# Предельная глубина вложенного дерева подзадач: каждый уровень - два уровня вложенности JSON,
+# а orjson и pydantic не сериализуют ответы глубже ~250 уровней. Глубокие цепочки - только flat=true
+TREE_MAX_NESTED_DEPTH = 100
+
+
+async def get_all_tasks(session: AsyncSession, limit: int = 100, after: int | None = None,
+                        is_active: bool | None = None, employee_id: int | None = None,
+                        deadline_from: date | None = None, deadline_to: date | None = None) -> list[Row]:
+    """
+    Получает страницу списка задач (keyset-пагинация по id) с фильтрами.
+    Возвращает строки, а не ORM-объекты: список только читается.
+    """
+    stmt = select(Task.__table__)
+    if after is not None:
+        stmt = stmt.where(Task.id > after)
+    if is_active is not None:
+        stmt = stmt.where(Task.is_active.is_(is_active))
+    if employee_id is not None:
+        stmt = stmt.where(Task.employee_id == employee_id)
+    if deadline_from is not None:
+        stmt = stmt.where(Task.deadline >= deadline_from)
+    if deadline_to is not None:
+        stmt = stmt.where(Task.deadline <= deadline_to)
+    stmt = stmt.order_by(Task.id).limit(limit)
+    result: Result = await session.execute(stmt)
+    return list(result.all())
+
+
+async def search_tasks(query: str, session: AsyncSession, limit: int = 20, offset: int = 0,
+                       is_active: bool | None = None) -> list[Row]:
+    """Ищет задачи по названию: сначала самые релевантные"""
+    condition, rank = text_search(Task.title, query)
+    stmt = select(Task.__table__, rank.label('rank')).where(condition)
+    if is_active is not None:
+        stmt = stmt.where(Task.is_active.is_(is_active))
+    stmt = stmt.order_by(rank.desc(), Task.id).limit(limit).offset(offset)
+    result: Result = await session.execute(stmt)
+    return list(result.all())
+
+
+def export_tasks(session: AsyncSession, export_format: ExportFormat):
+    """Выгружает все задачи потоком, не держа всю таблицу в памяти"""
+    stmt = select(
+        Task.id, Task.title, Task.deadline, Task.is_active, Task.base_task, Task.employee_id
+    ).order_by(Task.id)
+    return export_rows(stmt, session, export_format)
+
+
+async def get_task_changes(token: str | None, limit: int, session: AsyncSession) -> dict:
+    """Получает страницу задач, измененных и удаленных после позиции token"""
+    tasks, deleted, next_token, has_more = await get_changes(
+        Task.__table__, 'task', SyncToken.decode(token), limit, session
+    )
+    return {'items': tasks, 'deleted': deleted, 'next_token': next_token.encode(), 'has_more': has_more}
+
+
+async def _get_tasks_by_deadline(session: AsyncSession, deadline_to, deadline_from=None, limit: int = 100,
+                                 after_deadline: date | None = None, after: int | None = None,
+                                 employee_id: int | None = None) -> list[Row]:
+    """
+    Активные задачи со сроком в [deadline_from, deadline_to) по возрастанию срока
+    (keyset-пагинация по deadline, id; идет по частичному индексу ix_tasks_active_deadline)
+    """
+    stmt = select(Task.__table__).where(Task.is_active, Task.deadline < deadline_to)
+    if deadline_from is not None:
+        stmt = stmt.where(Task.deadline >= deadline_from)
+    if employee_id is not None:
+        stmt = stmt.where(Task.employee_id == employee_id)
+    if after_deadline is not None and after is not None:
+        stmt = stmt.where(tuple_(Task.deadline, Task.id) > tuple_(after_deadline, after))
+    stmt = stmt.order_by(Task.deadline, Task.id).limit(limit)
+    result: Result = await session.execute(stmt)
+    return list(result.all())
+
+
+async def get_overdue_tasks(session: AsyncSession, **page) -> list[Row]:
+    """Получает активные задачи, срок которых уже прошел"""
+    return await _get_tasks_by_deadline(session, func.current_date(), **page)
 
 
-async def get_all_tasks(session: AsyncSession) -> list[Task]:
-    """Получает список всех задач"""
-    stmt = select(Task).order_by(Task.id)
+async def get_due_soon_tasks(days: int, session: AsyncSession, **page) -> list[Row]:
+    """Получает активные задачи со сроком от сегодня до сегодня + days включительно"""
+    today = func.current_date()
+    return await _get_tasks_by_deadline(session, today + (days + 1), today, **page)
+
+
+async def get_deadline_summary(days: int, session: AsyncSession, employee_id: int | None = None) -> dict:
+    """
+    Количество просроченных и скоро истекающих активных задач по каждому исполнителю
+    одним запросом; общие итоги суммируются из тех же строк
+    """
+    today = func.current_date()
+    stmt = (
+        select(
+            Task.employee_id,
+            func.count().filter(Task.deadline < today).label('overdue'),
+            func.count().filter(Task.deadline >= today).label('due_soon'),
+        )
+        .where(Task.is_active, Task.deadline < today + (days + 1))
+        .group_by(Task.employee_id)
+        .order_by(Task.employee_id.nulls_first())
+    )
+    if employee_id is not None:
+        stmt = stmt.where(Task.employee_id == employee_id)
     result: Result = await session.execute(stmt)
-    tasks = result.scalars().all()
-    return list(tasks)
+    employees = result.all()
+    return {
+        'days': days,
+        'overdue': sum(row.overdue for row in employees),
+        'due_soon': sum(row.due_soon for row in employees),
+        'employees': employees,
+    }
 
 
 async def get_task(task_id: int, session: AsyncSession) -> Task | None:
@@ -28,41 +153,426 @@ async def create_task(new_task: TaskCreate, session: AsyncSession) -> Task:
     """Создает новоую задачу"""
     task = Task(**new_task.model_dump())
     session.add(task)
+    if task.is_active:
+        await change_active_tasks_count(task.employee_id, 1, session)
+    await session.flush()
+    await record_change(session, 'task', 'created', [task.id])
     await session.commit()
+    await invalidate(TASKS_TAG, EMPLOYEES_TAG)
     return task
 
 
-async def update_task(task_id: int, task_update: TaskUpdate, session: AsyncSession) -> Task:
-    """Обновляет данные по задаче"""
-    stmt = select(Task).where(Task.id == task_id)
+async def update_task(task_id: int, task_update: TaskUpdate, session: AsyncSession,
+                      expected_versions: list[int] | None = None) -> Task | Row | None:
+    """
+    Обновляет данные по задаче одним UPDATE ... RETURNING.
+    Старые значения для счетчиков нагрузки берутся из того же запроса (CTE с FOR UPDATE).
+    С expected_versions обновляет, только если версия строки среди них, иначе VersionConflict.
+    """
+    update_data = task_update.model_dump(exclude_none=True)
+    if not update_data:
+        task = await get_task(task_id, session)
+        if task is not None and expected_versions is not None and task.version not in expected_versions:
+            raise VersionConflict
+        return task
+
+    tasks = Task.__table__
+    # старые значения читаются с блокировкой строки: у самосоединения без нее второй из конкурирующих
+    # UPDATE перепроверяет новую версию строки, но берет старые значения из устаревшего снимка
+    old = (
+        select(tasks.c.id, tasks.c.employee_id, tasks.c.is_active)
+        .where(tasks.c.id == task_id)
+        .with_for_update()
+        .cte('old')
+    )
+    stmt = (
+        update(tasks)
+        .where(tasks.c.id == old.c.id)
+        .values(**update_data)
+        .returning(*tasks.c, old.c.employee_id.label('old_employee_id'), old.c.is_active.label('was_active'))
+    )
+    if expected_versions is not None:
+        stmt = stmt.where(tasks.c.version.in_(expected_versions))
     result: Result = await session.execute(stmt)
-    task: Task | None = result.scalar_one_or_none()
-    for key, value in task_update.model_dump(exclude_none=True).items():
-        setattr(task, key, value)
+    task: Row | None = result.one_or_none()
+    if task is None:
+        if expected_versions is not None and await session.scalar(select(tasks.c.id).where(tasks.c.id == task_id)):
+            raise VersionConflict
+        return None
+    if (task.old_employee_id, task.was_active) != (task.employee_id, task.is_active):
+        if task.was_active:
+            await change_active_tasks_count(task.old_employee_id, -1, session)
+        if task.is_active:
+            await change_active_tasks_count(task.employee_id, 1, session)
+    await record_change(session, 'task', 'updated', [task.id])
     await session.commit()
+    await invalidate(TASKS_TAG, EMPLOYEES_TAG)
     return task
 
 
 async def delete_task(task_id: int, session: AsyncSession):
-    """Удаляет задачу"""
-    stmt = select(Task).where(Task.id == task_id)
+    """
+    Удаляет задачу одним DELETE ... RETURNING.
+    Ее подзадачи, как и раньше, становятся корневыми - в той же транзакции.
+    """
+    tasks = Task.__table__
+    stmt = (
+        update(tasks)
+        .where(tasks.c.base_task == task_id, tasks.c.id != task_id)
+        .values(base_task=None)
+        .returning(tasks.c.id)
+    )
     result: Result = await session.execute(stmt)
-    task: Task | None = result.scalar_one_or_none()
-    await session.delete(task)
+    detached = result.scalars().all()
+    stmt = delete(tasks).where(tasks.c.id == task_id).returning(tasks.c.employee_id, tasks.c.is_active)
+    result = await session.execute(stmt)
+    task: Row | None = result.one_or_none()
+    if task is None:
+        return None
+    if task.is_active:
+        await change_active_tasks_count(task.employee_id, -1, session)
+    await record_tombstones('task', [task_id], session)
+    await record_change(session, 'task', 'updated', list(detached))
+    await record_change(session, 'task', 'deleted', [task_id])
     await session.commit()
+    await invalidate(TASKS_TAG, EMPLOYEES_TAG)
     return {'result': 'success'}
 
 
-async def get_important_tasks(session: AsyncSession):
-    """Получает список важных задач"""
-    stmt = select(Task).outerjoin(
-        Employee, Task.employee_id == Employee.id
-        ).filter(
-        Task.employee_id.is_(None),
-        Task.parent_task.has(Task.employee_id.isnot(None))
-        ).options(joinedload(Task.parent_task).joinedload(Task.employee).joinedload(Employee.tasks))
+async def _reference_errors(items: list[TaskCreate | TaskUpdate], session: AsyncSession) -> dict[int, str]:
+    """Проверяет ссылки на сотрудников и базовые задачи для пакета, двумя запросами на весь пакет"""
+    employee_ids = await existing_ids(Employee, {i.employee_id for i in items if i.employee_id is not None}, session)
+    task_ids = await existing_ids(Task, {i.base_task for i in items if i.base_task is not None}, session)
+    errors = {}
+    for index, item in enumerate(items):
+        if item.employee_id is not None and item.employee_id not in employee_ids:
+            errors[index] = 'Employee not found'
+        elif item.base_task is not None and item.base_task not in task_ids:
+            errors[index] = 'Base task not found'
+    return errors
+
+
+async def bulk_create_tasks(new_tasks: list[TaskCreate], session: AsyncSession) -> list[BulkItemResult]:
+    """Создает пакет задач одним INSERT ... RETURNING в одной транзакции"""
+    errors = await _reference_errors(new_tasks, session)
+    rows = [task.model_dump() for index, task in enumerate(new_tasks) if index not in errors]
+
+    ids = []
+    if rows:
+        stmt = insert(Task).returning(Task.id, sort_by_parameter_order=True)
+        result: Result = await session.execute(stmt, rows)
+        ids = result.scalars().all()
+        await change_active_tasks_counts(
+            Counter(row['employee_id'] for row in rows if row['is_active'] and row['employee_id'] is not None),
+            session
+        )
+        await record_change(session, 'task', 'created', list(ids))
+        await session.commit()
+        await invalidate(TASKS_TAG, EMPLOYEES_TAG)
+
+    results, created = [], iter(ids)
+    for index in range(len(new_tasks)):
+        if index in errors:
+            results.append(failed(index, errors[index]))
+        else:
+            results.append(BulkItemResult(index=index, id=next(created)))
+    return results
+
+
+async def bulk_update_tasks(tasks_update: list[TaskBulkUpdate], session: AsyncSession) -> list[BulkItemResult]:
+    """
+    Обновляет пакет задач одним UPDATE ... FROM (VALUES ...) в одной транзакции.
+    Старые значения для счетчиков нагрузки берутся из того же запроса.
+    """
+    errors = await _reference_errors(tasks_update, session)
+    seen = set()
+    rows = []
+    for index, item in enumerate(tasks_update):
+        if index in errors:
+            continue
+        if item.id in seen:
+            errors[index] = 'Duplicate id in batch'
+            continue
+        seen.add(item.id)
+        rows.append((item.id, item.title, item.deadline, item.is_active, item.base_task, item.employee_id))
+
+    updated = set()
+    if rows:
+        data = values(
+            column('id', Integer), column('title', String), column('deadline', TIMESTAMP),
+            column('is_active', Boolean), column('base_task', Integer), column('employee_id', Integer),
+            name='data'
+        ).data(rows)
+        tasks = Task.__table__
+        # старые значения - из CTE с блокировкой строк (см. update_task), в порядке id против взаимоблокировок
+        old = (
+            select(tasks.c.id, tasks.c.employee_id, tasks.c.is_active)
+            .where(tasks.c.id == id_array(row[0] for row in rows))
+            .order_by(tasks.c.id)
+            .with_for_update()
+            .cte('old')
+        )
+        stmt = (
+            update(tasks)
+            .where(tasks.c.id == data.c.id, old.c.id == data.c.id)
+            # столбец VALUES, пустой во всех строках, Postgres считает text - типы приводятся явно
+            .values(
+                title=func.coalesce(cast(data.c.title, String), tasks.c.title),
+                deadline=func.coalesce(cast(data.c.deadline, TIMESTAMP), tasks.c.deadline),
+                is_active=func.coalesce(cast(data.c.is_active, Boolean), tasks.c.is_active),
+                base_task=func.coalesce(cast(data.c.base_task, Integer), tasks.c.base_task),
+                employee_id=func.coalesce(cast(data.c.employee_id, Integer), tasks.c.employee_id),
+            )
+            .returning(
+                tasks.c.id,
+                old.c.employee_id.label('old_employee_id'), old.c.is_active.label('was_active'),
+                tasks.c.employee_id, tasks.c.is_active,
+            )
+        )
+        result: Result = await session.execute(stmt)
+        deltas = Counter()
+        for task_id, old_employee_id, was_active, employee_id, is_active in result.all():
+            updated.add(task_id)
+            if was_active and old_employee_id is not None:
+                deltas[old_employee_id] -= 1
+            if is_active and employee_id is not None:
+                deltas[employee_id] += 1
+        await change_active_tasks_counts(deltas, session)
+        await record_change(session, 'task', 'updated', sorted(updated))
+        await session.commit()
+        await invalidate(TASKS_TAG, EMPLOYEES_TAG)
+
+    results = []
+    for index, item in enumerate(tasks_update):
+        if index in errors:
+            results.append(failed(index, errors[index], item.id))
+        elif item.id in updated:
+            results.append(BulkItemResult(index=index, id=item.id))
+        else:
+            results.append(failed(index, 'Task not found', item.id))
+    return results
+
+
+async def bulk_delete_tasks(task_ids: list[int], session: AsyncSession) -> list[BulkItemResult]:
+    """
+    Удаляет пакет задач одним DELETE ... WHERE id = ANY(...) в одной транзакции.
+    Подзадачи, которые не удаляются вместе с базовой, становятся корневыми, как в delete_task.
+    """
+    tasks = Task.__table__
+    stmt = (
+        update(tasks)
+        .where(tasks.c.base_task == id_array(task_ids), tasks.c.id.not_in(task_ids))
+        .values(base_task=None)
+        .returning(tasks.c.id)
+    )
+    result: Result = await session.execute(stmt)
+    detached = result.scalars().all()
+    stmt = (
+        delete(tasks)
+        .where(tasks.c.id == id_array(task_ids))
+        .returning(tasks.c.id, tasks.c.employee_id, tasks.c.is_active)
+    )
+    result = await session.execute(stmt)
+    deleted, deltas = set(), Counter()
+    for task_id, employee_id, is_active in result.all():
+        deleted.add(task_id)
+        if is_active and employee_id is not None:
+            deltas[employee_id] -= 1
+    if deleted:
+        await change_active_tasks_counts(deltas, session)
+        await record_tombstones('task', sorted(deleted), session)
+        await record_change(session, 'task', 'updated', sorted(detached))
+        await record_change(session, 'task', 'deleted', sorted(deleted))
+        await session.commit()
+        await invalidate(TASKS_TAG, EMPLOYEES_TAG)
+
+    results, seen = [], set()
+    for index, task_id in enumerate(task_ids):
+        if task_id in seen:
+            results.append(failed(index, 'Duplicate id in batch', task_id))
+        elif task_id in deleted:
+            results.append(BulkItemResult(index=index, id=task_id))
+        else:
+            results.append(failed(index, 'Task not found', task_id))
+        seen.add(task_id)
+    return results
+
+
+@single_flight(TASKS_TAG, EMPLOYEES_TAG)
+@cached(TASKS_TAG, EMPLOYEES_TAG, adapter=TypeAdapter(list[ImportantTask]))
+async def get_important_tasks(session: AsyncSession) -> list[dict]:
+    """
+    Получает список важных задач вместе с сотрудником, которому их можно поручить.
+    Нагрузка сотрудников берется из счетчика, весь результат - одним запросом.
+    """
+    parent_task = aliased(Task)
+    parent_employee = aliased(Employee)
+    available_employee = aliased(Employee)
+
+    least_busy = (
+        select(Employee.id, Employee.active_tasks_count)
+        .order_by(Employee.active_tasks_count, Employee.id)
+        .limit(1)
+        .cte('least_busy')
+    )
+
+    available_employee_id = case(
+        (parent_employee.active_tasks_count - least_busy.c.active_tasks_count <= PARENT_ASSIGNEE_LOAD_GAP,
+         parent_employee.id),
+        else_=least_busy.c.id,
+    )
+
+    stmt = (
+        select(Task, available_employee)
+        .join(parent_task, Task.base_task == parent_task.id)
+        .join(parent_employee, parent_task.employee_id == parent_employee.id)
+        .join(least_busy, true())
+        .join(available_employee, available_employee.id == available_employee_id)
+        .where(Task.employee_id.is_(None))
+        .order_by(Task.id)
+    )
 
     result: Result = await session.execute(stmt)
-    tasks = result.unique().scalars().all()
+    return [
+        {
+            'task': TaskRead.model_validate(task, from_attributes=True),
+            'available_employee': available_employee.__str__()
+        }
+        for task, available_employee in result.all()
+    ]
 
-    return tasks
+
+async def _walk_tasks(task_id: int, max_depth: int, downwards: bool, session: AsyncSession) -> list[Row]:
+    """
+    Обходит дерево зависимостей задачи одним WITH RECURSIVE запросом, не глубже max_depth.
+    У задачи одна базовая задача, поэтому вниз обход может вернуться только в стартовую задачу -
+    она и не раскрывается повторно. Цикл при обходе вверх ищет вызывающий код.
+    """
+    tasks = Task.__table__
+    columns = [tasks.c.id, tasks.c.title, tasks.c.deadline, tasks.c.is_active, tasks.c.base_task, tasks.c.employee_id,
+               tasks.c.version]
+    walk = (
+        select(*columns, literal(0).label('depth'))
+        .where(tasks.c.id == task_id)
+        .cte('walk', recursive=True)
+    )
+    step = tasks.alias('step')
+    if downwards:
+        join_condition, guard = step.c.base_task == walk.c.id, step.c.id != task_id
+    else:
+        join_condition, guard = step.c.id == walk.c.base_task, true()
+    walk = walk.union_all(
+        select(*(step.c[c.key] for c in columns), (walk.c.depth + 1).label('depth'))
+        .join(walk, join_condition)
+        .where(walk.c.depth < max_depth, guard)
+    )
+    stmt = select(*(walk.c[c.key] for c in columns), walk.c.depth).order_by(walk.c.depth, walk.c.id)
+    result: Result = await session.execute(stmt)
+    return result.all()
+
+
+async def get_task_tree(task_id: int, max_depth: int, flat: bool, session: AsyncSession) -> dict | None:
+    """Получает дерево подзадач задачи одним запросом: вложенным или плоским списком"""
+    rows = await _walk_tasks(task_id, max_depth, True, session)
+    if not rows:
+        return None
+    # цикл вниз замыкается на стартовой задаче: ее базовая задача оказывается среди подзадач
+    has_cycle = rows[0].base_task is not None and any(row.id == rows[0].base_task for row in rows)
+    if flat:
+        return {'has_cycle': has_cycle, 'nodes': [row._asdict() for row in rows]}
+
+    nodes = {}
+    for row in rows:
+        node = row._asdict()
+        node['subtasks'] = []
+        nodes[node['id']] = node
+        if node['depth'] > 0:
+            nodes[node['base_task']]['subtasks'].append(node)
+    return {'has_cycle': has_cycle, 'root': nodes[task_id]}
+
+
+async def get_task_ancestors(task_id: int, max_depth: int, session: AsyncSession) -> dict | None:
+    """Получает цепочку базовых задач от родителя до корня одним запросом"""
+    rows = await _walk_tasks(task_id, max_depth, False, session)
+    if not rows:
+        return None
+    ancestors, seen, has_cycle = [], {task_id}, False
+    for row in rows[1:]:
+        # в цикле запрос ходит по кругу до max_depth: цепочка обрывается на первом повторе
+        if row.id in seen:
+            has_cycle = True
+            break
+        seen.add(row.id)
+        ancestors.append(row._asdict())
+    return {'has_cycle': has_cycle, 'ancestors': ancestors}
+
+
+def plan_assignments(tasks: list[tuple[int, int | None]], loads: dict[int, int]) -> list[tuple[int, int]]:
+    """
+    Распределяет задачи (id, исполнитель базовой задачи) в переданном порядке.
+    Задача достается исполнителю базовой задачи, если он загружен не больше чем на
+    PARENT_ASSIGNEE_LOAD_GAP задач сильнее самого свободного, иначе - самому свободному.
+    Самый свободный берется из кучи нагрузок; устаревшие записи кучи пропускаются.
+    """
+    heap = [(load, employee_id) for employee_id, load in loads.items()]
+    heapq.heapify(heap)
+    assignments = []
+    for task_id, parent_employee_id in tasks:
+        while heap[0][0] != loads[heap[0][1]]:
+            heapq.heappop(heap)
+        least_load, least_busy_id = heap[0]
+        employee_id = least_busy_id
+        if (parent_employee_id in loads
+                and loads[parent_employee_id] - least_load <= PARENT_ASSIGNEE_LOAD_GAP):
+            employee_id = parent_employee_id
+        loads[employee_id] += 1
+        heapq.heappush(heap, (loads[employee_id], employee_id))
+        assignments.append((task_id, employee_id))
+    return assignments
+
+
+async def assign_tasks(task_ids: list[int] | None, session: AsyncSession) -> list[tuple[int, int]]:
+    """
+    Распределяет активные неназначенные задачи (все или переданные) между сотрудниками
+    за один проход: сначала задачи с ближайшим сроком. Все назначения пишутся одним
+    UPDATE в одной транзакции.
+    """
+    result: Result = await session.execute(select(Employee.id, Employee.active_tasks_count))
+    loads = dict(result.all())
+    if not loads:
+        return []
+
+    parent_task = aliased(Task)
+    stmt = (
+        select(Task.id, parent_task.employee_id)
+        .outerjoin(parent_task, Task.base_task == parent_task.id)
+        .where(Task.employee_id.is_(None), Task.is_active.is_(True))
+        .order_by(Task.deadline, Task.id)
+    )
+    if task_ids is not None:
+        stmt = stmt.where(Task.id == id_array(task_ids))
+    result = await session.execute(stmt)
+    assignments = plan_assignments(result.all(), loads)
+    if not assignments:
+        return []
+
+    # два массива вместо VALUES: число параметров не зависит от размера пакета
+    data = func.unnest(
+        bindparam('task_ids', [task_id for task_id, _ in assignments], type_=ARRAY(Integer)),
+        bindparam('employee_ids', [employee_id for _, employee_id in assignments], type_=ARRAY(Integer)),
+    ).table_valued(column('id', Integer), column('employee_id', Integer)).render_derived(name='data')
+    tasks = Task.__table__
+    stmt = (
+        update(tasks)
+        # задачу могли назначить или закрыть после выборки: такие строки не обновляются
+        .where(tasks.c.id == data.c.id, tasks.c.employee_id.is_(None), tasks.c.is_active.is_(True))
+        .values(employee_id=data.c.employee_id)
+        .returning(tasks.c.id, tasks.c.employee_id)
+    )
+    result = await session.execute(stmt)
+    assigned = result.all()
+    await change_active_tasks_counts(Counter(employee_id for _, employee_id in assigned), session)
+    await record_change(session, 'task', 'updated', [task_id for task_id, _ in assigned])
+    await session.commit()
+    await invalidate(TASKS_TAG, EMPLOYEES_TAG)
+    return [(task_id, employee_id) for task_id, employee_id in assigned]
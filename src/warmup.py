@@ -0,0 +1,68 @@
+import asyncio
+import inspect
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.config import settings
+from src.database import engine, read_engine
+from src.employees import services as employee_services
+from src.tasks import services as task_services
+
+logger = logging.getLogger(__name__)
+
+# Запросы самых частых GET-маршрутов. Выполняются без кэша (inspect.unwrap снимает декораторы),
+# чтобы на каждом соединении пула появились подготовленные выражения asyncpg
+WARMUP_QUERIES = (
+    lambda session: inspect.unwrap(employee_services.get_all_employees)(session),
+    lambda session: inspect.unwrap(employee_services.get_engaged_employees)(session),
+    lambda session: employee_services.get_employee(0, session),
+    lambda session: task_services.get_all_tasks(session),
+    lambda session: task_services.get_task(0, session),
+    lambda session: inspect.unwrap(task_services.get_important_tasks)(session),
+    lambda session: task_services.get_overdue_tasks(session),
+)
+
+
+async def _warm_connection(db_engine: AsyncEngine) -> None:
+    async with db_engine.connect() as connection:
+        async with AsyncSession(bind=connection) as session:
+            for query in WARMUP_QUERIES:
+                try:
+                    await query(session)
+                except Exception:
+                    # прогрев не должен ломаться из-за одного запроса (например, на реплике другой СУБД)
+                    logger.warning('Warmup query failed', exc_info=True)
+                    await session.rollback()
+        await connection.rollback()
+
+
+async def warm_up_engine(db_engine: AsyncEngine) -> None:
+    """
+    Открывает все постоянные соединения пула и выполняет на каждом частые запросы.
+    Соединения берутся одновременно, иначе пул отдавал бы одно и то же.
+    """
+    if settings.db_null_pool:
+        async with db_engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+        return
+    await asyncio.gather(*(_warm_connection(db_engine) for _ in range(settings.db_pool_size)))
+
+
+async def warm_up(state) -> None:
+    """Прогревает движки до успеха (повторяя при недоступной базе) и отмечает процесс готовым"""
+    started = time.perf_counter()
+    while True:
+        try:
+            await warm_up_engine(engine)
+            if read_engine is not engine:
+                await warm_up_engine(read_engine)
+        except Exception:
+            logger.exception('Warmup failed, retrying in %s s', settings.warmup_retry_interval)
+            await asyncio.sleep(settings.warmup_retry_interval)
+        else:
+            break
+    state.warm = True
+    logger.info('Warm in %.2f s', time.perf_counter() - started)